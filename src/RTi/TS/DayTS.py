@@ -68,6 +68,9 @@ class DayTS(TS):
     extended for variations on daily data.  Override the allocateDataSpace() and set/get methods to do so.
     """
 
+    # Data members in addition to those in TS (see TS.__slots__).
+    __slots__ = ('data', 'data_flags', 'pos', 'row', 'column')
+
     # The DataFlavor for transferring this specific class.
     # dayTSFlavor = DataFlavor(RTi.TS.DayTS.class, "RTi.TS.DayTS")
 
@@ -66,6 +66,9 @@ class MonthTS(TS):
     class for specific monthly time series formats (override allocateDataSpace() to control memory management).
     """
 
+    # Data members in addition to those in TS (see TS.__slots__).
+    __slots__ = ('data', 'data_flags', 'min_amon', 'max_amon', 'pos')
+
     # The DataFlavor for transferring this specific class.
     # dayTSFlavor = DataFlavor(RTi.TS.DayTS.class, "RTi.TS.DayTS")
 
@@ -225,6 +228,46 @@ class MonthTS(TS):
                         str(value))
         return value
 
+    def get_values_range(self, start, end):
+        """
+        Return the data values for a period.  The values are copied from the rows of the data space
+        for the years in the period, rather than calling get_data_value() for each month.
+        :param start: First date of the period.
+        :param end: Last date of the period.
+        :return: list of the data values for the period, including missing values outside the period of record.
+        """
+        amon1 = start.get_absolute_month()
+        amon2 = end.get_absolute_month()
+        if amon2 < amon1:
+            return []
+
+        # Limit the period to the months that are stored...
+
+        first_amon = max(amon1, self.min_amon)
+        last_amon = min(amon2, self.max_amon)
+        if (self.data is None) or (first_amon > last_amon):
+            return [self.missing]*(amon2 - amon1 + 1)
+
+        # Position of the first and last months relative to January of the first year in the data space...
+
+        jan_amon = self.date1.get_year()*12 + 1
+        first_index = first_amon - jan_amon
+        last_index = last_amon - jan_amon
+        first_row = first_index//12
+        values = []
+        for row in self.data[first_row:last_index//12 + 1]:
+            values.extend(row)
+        offset = first_row*12
+        values = values[first_index - offset:last_index - offset + 1]
+
+        # Fill outside the period of record with missing...
+
+        if first_amon > amon1:
+            values = [self.missing]*(first_amon - amon1) + values
+        if last_amon < amon2:
+            values.extend([self.missing]*(amon2 - last_amon))
+        return values
+
     def set_data_value(self, date, value):
         """
         Set the data value for the specified date.
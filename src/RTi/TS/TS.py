@@ -86,6 +86,17 @@ class TS(object):
     This class is the base class for all time series classes.
     """
 
+    __slots__ = ('status', 'date1', 'date1_original', 'date2', 'date2_original', 'data_interval_base',
+                 'data_interval_mult', 'data_interval_base_original', 'data_interval_mult_original', 'data_size',
+                 'data_units', 'data_units_original', 'has_data_flags', 'internDataFlagStrings', 'version',
+                 'input_name', 'tsid', 'dirty', 'editable', 'description', 'comments', 'dataFlagMetadataList',
+                 'genesis', 'property_HashMap', 'missing', 'missingl', 'missingu', 'data_limits',
+                 'data_limits_original', 'legend', 'extended_legend', 'enabled', 'selected', 'debug')
+
+    # Indicates whether genesis information is recorded.  Applications that create many transient time series
+    # can set this to False to avoid building and saving genesis strings that will not be used.
+    GENESIS_ENABLED = True
+
     def __init__(self, ts=None):
         # General string to use for status of the time series (use as appropriate by
         # high-level code).  This value is volatile - do not assume its value will remain
@@ -232,9 +243,10 @@ class TS(object):
         Add a string to the genesis string list.  The genesis is a list of comments
         indicating how the time series was read and manipulated.  Genesis information
         should be added by methods that, for example, fill data and change the period.
-        :param genesis: Comment string to add to genesis information.
+        :param genesis: Comment string to add to genesis information.  The string is ignored
+        if TS.GENESIS_ENABLED is False.
         """
-        if genesis is not None:
+        if (genesis is not None) and self.GENESIS_ENABLED:
             self.genesis.append(genesis)
 
     def allocate_data_space(self):
@@ -344,6 +356,46 @@ class TS(object):
         """
         return self.tsid.get_location()
 
+    def get_missing(self):
+        """
+        Return the missing data value used for the time series (single value).
+        :return: The missing data value used for the time series (single value).
+        """
+        return self.missing
+
+    def get_property(self, property_name):
+        """
+        Get a time series property's contents (case-specific).
+        :param property_name: name of property being retrieved.
+        :return: property object corresponding to the property name, or None if not set.
+        """
+        if self.property_HashMap is None:
+            return None
+        return self.property_HashMap.get(property_name)
+
+    def get_values_range(self, start, end):
+        """
+        Return the data values for a period, for regular interval time series.  This version calls
+        get_data_value() for each date in the period.  Derived classes can override this method to
+        return the values directly from their data space, which avoids a method call for each value.
+        :param start: First date of the period.
+        :param end: Last date of the period.
+        :return: list of the data values for the period, including missing values.
+        """
+        values = []
+        date = DateTime(date_time=start)
+        # Bind the methods to local names to avoid attribute lookups in the loop...
+        append_value = values.append
+        get_data_value = self.get_data_value
+        add_interval = date.add_interval
+        less_than_or_equal_to = date.less_than_or_equal_to
+        interval_base = self.data_interval_base
+        interval_mult = self.data_interval_mult
+        while less_than_or_equal_to(end):
+            append_value(get_data_value(date))
+            add_interval(interval_base, interval_mult)
+        return values
+
     def initialize(self):
         """
         Initialize data members.
@@ -414,6 +466,18 @@ class TS(object):
         self.data_interval_base_original = base
         self.data_interval_mult_original = mult
 
+    def set_data_interval_and_original(self, base, mult):
+        """
+        Set the data interval and the data interval for the original data to the same interval,
+        as when a new time series is created.
+        :param base: Base interval (see TimeInterval.*)
+        :param mult: Base interval multiplier.
+        """
+        self.data_interval_base = base
+        self.data_interval_mult = mult
+        self.data_interval_base_original = base
+        self.data_interval_mult_original = mult
+
     def set_data_size(self, data_size):
         """
         Set the number of data points including the full period. This should be called by refresh()
@@ -544,7 +608,7 @@ class TS(object):
         :param missing: Missing data value for time series.
         """
         self.missing = missing
-        if not math.isnan(missing):
+        if math.isnan(missing):
             # Set the bounding limits also just to make sure that values like -999 are not treated as missing.
             self.missingl = math.nan
             self.missingu = math.nan
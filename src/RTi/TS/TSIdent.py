@@ -22,10 +22,38 @@
 # NoticeEnd
 
 import logging
+from contextlib import contextmanager
 
 from RTi.Util.String.StringUtil import StringUtil
 from RTi.Util.Time.TimeInterval import TimeInterval
 
+_logger = logging.getLogger(__name__)
+
+
+# Interval strings that have been parsed successfully, mapped to (interval base, interval multiplier)
+_interval_cache = {}
+_INTERVAL_CACHE_SIZE = 128
+
+
+def _parse_interval_cached(interval_string):
+    """
+    Parse an interval string, caching the result because the same few interval strings are parsed repeatedly.
+    The base and multiplier are returned rather than the TimeInterval so that a shared mutable instance
+    is not cached.  Intervals that cannot be parsed are not cached, so that TimeInterval.parse_interval()
+    logs a warning each time.
+    :param interval_string: Data interval string.
+    :return: tuple of (interval base, interval multiplier), or None if the interval could not be parsed.
+    """
+    base_mult = _interval_cache.get(interval_string)
+    if base_mult is None:
+        tsinterval = TimeInterval.parse_interval(interval_string)
+        if tsinterval is None:
+            return None
+        base_mult = tsinterval.get_base(), tsinterval.get_multiplier()
+        if len(_interval_cache) < _INTERVAL_CACHE_SIZE:
+            _interval_cache[interval_string] = base_mult
+    return base_mult
+
 
 class TSIdent(object):
     """
@@ -44,6 +72,12 @@ class TSIdent(object):
     data, including data type, are stored only in the TSIdent, to avoid redundant data.
     """
 
+    __slots__ = ('identifier', 'comment', 'alias', 'full_location', 'location_type', 'main_location',
+                 'sub_location', 'full_source', 'main_source', 'sub_source', 'full_type', 'main_type',
+                 'sub_type', 'interval_string', 'interval_base', 'interval_mult', 'scenario', 'sequence_id',
+                 'input_type', 'input_name', 'behavior_mask', '_no_sub_location', '_no_sub_source',
+                 '_no_sub_type', '_no_validation', '_deferred')
+
     # Mask indicating that no sub-location should be allowed (treat as part of the main location),
     # used by setLocation()
     NO_SUB_LOCATION = 0x1
@@ -87,6 +121,25 @@ class TSIdent(object):
     # The quote can be used to surround TSID parts that have periods, so as to protect the part.
     PERIOD_QUOTE = "'"
 
+    # Characters that mean an identifier cannot simply be split on periods (quotes, location type,
+    # sequence ID, input type/name), used by parse_many() and parse_interval_only().
+    _SPECIAL_CHARS = ("'", '"', INPUT_SEPARATOR, LOC_TYPE_SEPARATOR, SEQUENCE_NUMBER_LEFT)
+
+    # Interval string suffix for each recognized base interval, used when setting the interval from parts.
+    _INTERVAL_SUFFIX = {
+        TimeInterval.SECOND: "sec",
+        TimeInterval.MINUTE: "min",
+        TimeInterval.HOUR: "hour",
+        TimeInterval.DAY: "day",
+        TimeInterval.WEEK: "week",
+        TimeInterval.MONTH: "month",
+        TimeInterval.YEAR: "year",
+        TimeInterval.IRREGULAR: "irreg"
+    }
+
+    # Empty string shared by all instances for default string parts.
+    _EMPTY = ""
+
     # Debug for class
     debug = False
 
@@ -122,16 +175,16 @@ class TSIdent(object):
         self.identifier = None
 
         # A comment that can be used to describe the TSID, for example on-line TSTool software comment.
-        self.comment = ""
+        self.comment = TSIdent._EMPTY
 
         # A short alias for the time series identifier.
-        self.alias = None
+        self.alias = TSIdent._EMPTY
 
         # The location (combining the main location and the sub-location).
         self.full_location = None
 
         # Location type (optional).
-        self.location_type = ""
+        self.location_type = TSIdent._EMPTY
 
         # The main location.
         self.main_location = None
@@ -182,6 +235,15 @@ class TSIdent(object):
         # Mask that controls behavior (e.g., how sub-fields are handled).
         self.behavior_mask = 0
 
+        # Behavior mask bits decoded by set_behavior_mask() so that setters do not need to test the mask.
+        self._no_sub_location = False
+        self._no_sub_source = False
+        self._no_sub_type = False
+        self._no_validation = False
+
+        # Nesting depth of batch_update(), when > 0 the identifier is not rebuilt by setters.
+        self._deferred = 0
+
         if (full_location is None) and (full_source is None) and (full_type is None) and \
             (interval_string is None) and (scenario is None) and (input_type is None) and \
                 (input_name is None) and (mask is None) and (identifier is None) and (tsident is None):
@@ -265,6 +327,81 @@ class TSIdent(object):
         self.interval_base = tsident.get_interval_base()
         self.interval_mult = tsident.get_interval_mult()
 
+    @contextmanager
+    def batch_update(self):
+        """
+        Context manager to set several identifier parts while rebuilding the full identifier only once.
+        Setters called within the block do not call set_identifier(), which is called when the
+        outermost block exits.  For example:
+        <pre>
+        with tsident.batch_update():
+            tsident.set_location(full_location="ABC")
+            tsident.set_source("USGS")
+        </pre>
+        """
+        self._deferred += 1
+        try:
+            yield self
+        finally:
+            self._deferred -= 1
+            if self._deferred == 0:
+                self.set_identifier()
+
+    @classmethod
+    def build_unchecked(cls, main_location, sub_location, main_source, sub_source, main_type, sub_type,
+                        interval_base, interval_mult, interval_string, scenario=""):
+        """
+        Create a TSIdent directly from its parts, without validation, parsing, or the setter cascade.
+        This is intended for bulk creation where the caller guarantees that the parts are well-formed
+        (for example, interval_string must be consistent with interval_base and interval_mult).
+        The default behavior mask (0) is used so sub-parts are joined to the main parts.
+        :param main_location: The main location.
+        :param sub_location: The sub-location, or empty string.
+        :param main_source: The main source.
+        :param sub_source: The sub-source, or empty string.
+        :param main_type: The main data type.
+        :param sub_type: The sub data type, or empty string.
+        :param interval_base: Base interval (see TimeInterval.*)
+        :param interval_mult: Base interval multiplier.
+        :param interval_string: Data interval string.
+        :param scenario: Scenario string.
+        :return: a new TSIdent instance.
+        """
+        tsident = cls.__new__(cls)
+        tsident.behavior_mask = 0
+        tsident._no_sub_location = False
+        tsident._no_sub_source = False
+        tsident._no_sub_type = False
+        tsident._no_validation = False
+        tsident._deferred = 0
+        tsident.comment = TSIdent._EMPTY
+        tsident.alias = TSIdent._EMPTY
+        tsident.location_type = TSIdent._EMPTY
+        tsident.main_location = main_location
+        tsident.sub_location = sub_location
+        tsident.main_source = main_source
+        tsident.sub_source = sub_source
+        tsident.main_type = main_type
+        tsident.sub_type = sub_type
+        tsident.interval_base = interval_base
+        tsident.interval_mult = interval_mult
+        tsident.interval_string = interval_string
+        tsident.scenario = scenario
+        tsident.sequence_id = None
+        tsident.input_type = TSIdent._EMPTY
+        tsident.input_name = TSIdent._EMPTY
+        tsident.full_location = \
+            f"{main_location}{TSIdent.LOCATION_SEPARATOR}{sub_location}" if sub_location else main_location
+        tsident.full_source = f"{main_source}{TSIdent.SOURCE_SEPARATOR}{sub_source}" if sub_source else main_source
+        tsident.full_type = f"{main_type}{TSIdent.TYPE_SEPARATOR}{sub_type}" if sub_type else main_type
+        if scenario:
+            tsident.identifier = f"{tsident.full_location}.{tsident.full_source}.{tsident.full_type}." \
+                                 f"{interval_string}.{scenario}"
+        else:
+            tsident.identifier = f"{tsident.full_location}.{tsident.full_source}.{tsident.full_type}." \
+                                 f"{interval_string}"
+        return tsident
+
     def get_alias(self):
         """
         Return the time series alias
@@ -329,31 +466,37 @@ class TSIdent(object):
                                                   input_name=input_name)
         else:
             # Logic to handle the most verbose variation
-            full_identifier = ""
+            # - collect the parts and then join them
+            parts = []
 
-            if (location_type is not None) and (len(location_type) > 0):
-                full_identifier += location_type + TSIdent.LOC_TYPE_SEPARATOR
+            if location_type:
+                parts.append(location_type)
+                parts.append(TSIdent.LOC_TYPE_SEPARATOR)
             if full_location is not None:
-                full_identifier += full_location
-            full_identifier += TSIdent.SEPARATOR
+                parts.append(full_location)
+            parts.append(TSIdent.SEPARATOR)
             if full_source is not None:
-                full_identifier += full_source
-            full_identifier += TSIdent.SEPARATOR
+                parts.append(full_source)
+            parts.append(TSIdent.SEPARATOR)
             if full_type is not None:
-                full_identifier += full_type
-            full_identifier += TSIdent.SEPARATOR
+                parts.append(full_type)
+            parts.append(TSIdent.SEPARATOR)
             if interval_string is not None:
-                full_identifier += interval_string
-            if (scenario is not None) and (len(scenario) != 0):
-                full_identifier += TSIdent.SEPARATOR
-                full_identifier += scenario
-            if (sequence_id is not None) and (len(sequence_id) != 0):
-                full_identifier += (TSIdent.SEQUENCE_NUMBER_LEFT + sequence_id + TSIdent.SEQUENCE_NUMBER_RIGHT)
-            if (input_type is not None) and (len(input_type) != 0):
-                full_identifier += "~" + input_type
-            if (input_name is not None) and (len(input_name) != 0):
-                full_identifier += "~" + input_name
-            return full_identifier
+                parts.append(interval_string)
+            if scenario:
+                parts.append(TSIdent.SEPARATOR)
+                parts.append(scenario)
+            if sequence_id:
+                parts.append(TSIdent.SEQUENCE_NUMBER_LEFT)
+                parts.append(sequence_id)
+                parts.append(TSIdent.SEQUENCE_NUMBER_RIGHT)
+            if input_type:
+                parts.append(TSIdent.INPUT_SEPARATOR)
+                parts.append(input_type)
+            if input_name:
+                parts.append(TSIdent.INPUT_SEPARATOR)
+                parts.append(input_name)
+            return "".join(parts)
 
     def get_input_name(self):
         """
@@ -439,7 +582,7 @@ class TSIdent(object):
         when an array of time series traces is maintained, for example in an ensemble.
         """
         if self.sequence_id is None:
-            return ""
+            return TSIdent._EMPTY
         else:
             return self.sequence_id
 
@@ -482,7 +625,7 @@ class TSIdent(object):
         """
         Initialize data members
         """
-        self.behavior_mask = 0  # Default is to process sub-location and sub-source
+        self.set_behavior_mask(0)  # Default is to process sub-location and sub-source
 
         # Initialize to None strings so that there are not problems with recursive logic.
         self.identifier = None
@@ -501,7 +644,7 @@ class TSIdent(object):
         self.input_type = None
         self.input_name = None
 
-        self.set_alias("")
+        self.set_alias(TSIdent._EMPTY)
 
         # Initialize the overall identifier to an empty string...
 
@@ -555,8 +698,6 @@ class TSIdent(object):
             behavior_mask = 0  # default
 
         # Main logic
-        logger = logging.getLogger(__name__)
-        dl = 100
 
         # Declare a TSIdent which we will fill and return..
         tsident = TSIdent(mask=behavior_mask)
@@ -564,8 +705,7 @@ class TSIdent(object):
         # First parse the datastore and input type information...
 
         identifier0 = identifier
-        part_list = StringUtil.break_string_list(identifier, "~", 0)
-        print(part_list)
+        part_list = identifier.split("~")
         if part_list is not None:
             nlist1 = len(part_list)
             # Reset to first part for checks below...
@@ -577,7 +717,7 @@ class TSIdent(object):
                 # File name may have a ~ so find the second instance
                 # of ~ and use the remaining string...
                 pos = identifier0.find("~")
-                if (pos >= 0) and (len(identifier) > (pos + 1)):
+                if (pos >= 0) and (len(identifier0) > (pos + 1)):
                     # Have something at the end...
                     sub = identifier0[pos + 1:]
                     pos = sub.find("~")
@@ -603,7 +743,7 @@ class TSIdent(object):
             part_list = TSIdent.parse_identifier_split_with_quotes(identifier)
         else:
             # No quote in TSID so do simple parse
-            part_list = StringUtil.break_string_list(identifier, ".", 0)
+            part_list = identifier.split(".")
         nlist1 = len(part_list)
 
         # Parse out location and split the rest of the ID...
@@ -634,7 +774,7 @@ class TSIdent(object):
                 # LocId.Source.'DataType-some.parts.with.periods'.Interval
                 part_list = TSIdent.parse_identifier_split_with_quotes(identifier[len(full_location) + 1:])
             else:
-                part_list = StringUtil.break_string_list(identifier[len(full_location) + 1], ".", 0)
+                part_list = identifier[len(full_location) + 1:].split(".")
             nlist1 = len(part_list)
         else:
             pos_quote2 = identifier.find("'")
@@ -643,7 +783,7 @@ class TSIdent(object):
                 # LocaId.Source.'DataType-some.parts.with.periods'.Interval
                 part_list = TSIdent.parse_identifier_split_with_quotes(identifier)
             else:
-                part_list = StringUtil.break_string_list(identifier, ".", 0)
+                part_list = identifier.split(".")
             nlist1 = len(part_list)
             if nlist1 >= 1:
                 full_location = part_list[0]
@@ -700,13 +840,59 @@ class TSIdent(object):
         tsident.set_location(full_location=full_location)
         tsident.set_source(full_source)
         tsident.set_type(full_type)
-        tsident.set_interval_string(interval_string)
+        tsident.set_interval(interval_string=interval_string)
         tsident.set_scenario(scenario)
         tsident.set_sequence_id(sequence_id)
 
         # Return the TSIdent object for use elsewhere...
         return tsident
 
+    @classmethod
+    def parse_many(cls, identifiers):
+        """
+        Parse a list of identifier strings, for example when loading a catalog of time series.
+        Simple identifiers of the form Location[-SubLoc].Source.Type[-Subtype].Interval[.Scenario]
+        are split directly and created with build_unchecked().  Identifiers that use quotes,
+        location type, sequence ID, input type/name, or an interval that cannot be parsed are
+        handled by parse_identifier().
+        :param identifiers: list of full identifier strings.
+        :return: list of TSIdent instances, in the same order as the identifiers.
+        """
+        # Local variables to avoid attribute lookups in the loop
+        build_unchecked = cls.build_unchecked
+        parse_identifier = TSIdent.parse_identifier
+        location_separator = TSIdent.LOCATION_SEPARATOR
+        source_separator = TSIdent.SOURCE_SEPARATOR
+        type_separator = TSIdent.TYPE_SEPARATOR
+        special_chars = TSIdent._SPECIAL_CHARS
+        tsidents = []
+        append = tsidents.append
+        for identifier in identifiers:
+            part_list = identifier.split(".", 4)
+            base_mult = None
+            if (len(part_list) >= 4) and not any(c in identifier for c in special_chars):
+                try:
+                    base_mult = _parse_interval_cached(part_list[3])
+                except Exception:
+                    # Let parse_identifier() handle the interval
+                    pass
+            if base_mult is None:
+                append(parse_identifier(identifier))
+                continue
+            main_location, separator, sub_location = part_list[0].partition(location_separator)
+            if not separator:
+                sub_location = ""
+            main_source, separator, sub_source = part_list[1].partition(source_separator)
+            if not separator:
+                sub_source = ""
+            main_type, separator, sub_type = part_list[2].partition(type_separator)
+            if not separator:
+                sub_type = ""
+            scenario = part_list[4] if len(part_list) == 5 else ""
+            append(build_unchecked(main_location, sub_location, main_source, sub_source, main_type, sub_type,
+                                   base_mult[0], base_mult[1], part_list[3], scenario))
+        return tsidents
+
     @staticmethod
     def parse_identifier_split_with_quotes(identifier):
         """
@@ -714,65 +900,55 @@ class TSIdent(object):
         :param identifier: TSID main part (no ~)
         :return: list of parts for TSID
         """
-        logger = logging.getLogger(__name__)
         # Process by getting one token at a time.
         # - tokens are between periods
         # - if first character of part is single quote, get to the next single quote
         parts = []
-        in_part = True
         in_quote = False
-        c = ''
         b = ""
-        ilen = len(identifier)
-        # Use debug messages for now but code seems to be OK
-        # - remove debug messages later.
-        for i in range(ilen):
-            c = identifier[i]
-            if c == '.':
-                if in_quote:
-                    b += c
-                else:
-                    # Not in quote
-                    if in_part:
-                        # Between periods. Already in part so end it without adding period.
-                        parts.append(b)
-                        # Will be in part at top of loop because current period will be skipped
-                        # - but if last period treat the following part as empty string
-                        if i == (ilen - 1):
-                            # Add an empty string
-                            parts.append("")
-                        else:
-                            # Keep processing
-                            # Set to not be in part
-                            in_part = False
-                            i -= 1  # Re-process period to trigger in a part in next iteration.
-                    else:
-                        # Was not in a part so start it
-                        in_part = True
-                        # Don't add period to part.
-            elif c == '\'':
-                # Found a quote, which will surround a point, as in: .'some.part'.
-                if in_quote:
-                    # At the end of the quoted part
-                    # Always include the quote in the part
-                    b += c
-                    parts.append(b)
-                    # Next period immediately following will cause next part to be added, even if
-                    # period at end of string
-                    in_quote = False
-                    in_part = False
-                else:
-                    # Need to start a part
-                    b += c
-                    in_quote = True
+        for c in identifier:
+            if (c == '.') and not in_quote:
+                # Between periods so end the part without adding the period.
+                # - if last period the following part is treated as empty string
+                parts.append(b)
+                b = ""
             else:
+                if c == '\'':
+                    # Found a quote, which will surround a part, as in: .'some.part'.
+                    # Always include the quote in the part
+                    in_quote = not in_quote
                 # Character to add to part
                 b += c
-                if i == (ilen - 1):
-                    # Last part
-                    parts.append(b)
+        # Last part
+        parts.append(b)
         return parts
 
+    @staticmethod
+    def parse_interval_only(identifier):
+        """
+        Parse only the interval from an identifier string, for example to determine the type of time series
+        to create.  Simple identifiers are split directly, as in parse_many(), without creating a TSIdent.
+        The input type/name and location type do not affect the interval so are ignored.
+        Other identifiers are handled by parse_identifier().
+        :param identifier: Full identifier as string.
+        :return: tuple of (interval string, interval base, interval multiplier).
+        """
+        main_identifier = identifier.partition(TSIdent.INPUT_SEPARATOR)[0]
+        location_type_sep_pos = main_identifier.find(TSIdent.LOC_TYPE_SEPARATOR)
+        if (location_type_sep_pos >= 0) and (location_type_sep_pos < main_identifier.find(TSIdent.SEPARATOR)):
+            main_identifier = main_identifier[location_type_sep_pos + 1:]
+        part_list = main_identifier.split(".", 4)
+        if (len(part_list) >= 4) and not any(c in main_identifier for c in TSIdent._SPECIAL_CHARS):
+            try:
+                base_mult = _parse_interval_cached(part_list[3])
+            except Exception:
+                # Let parse_identifier() handle the interval
+                base_mult = None
+            if base_mult is not None:
+                return part_list[3], base_mult[0], base_mult[1]
+        tsident = TSIdent.parse_identifier(identifier)
+        return tsident.get_interval(), tsident.get_interval_base(), tsident.get_interval_mult()
+
     def set_alias(self, alias):
         """
         Se the time series alias.
@@ -781,6 +957,29 @@ class TSIdent(object):
         if alias is not None:
             self.alias = alias
 
+    def set_all(self, full_location=None, full_source=None, full_type=None, interval_string=None,
+                scenario=None):
+        """
+        Set the main identifier parts, rebuilding the full identifier only once.
+        Parts that are None are not changed.
+        :param full_location: Full location string.
+        :param full_source: Full source string.
+        :param full_type: Full data type.
+        :param interval_string: Data interval string.
+        :param scenario: Scenario string.
+        """
+        with self.batch_update():
+            if full_location is not None:
+                self.set_location(full_location=full_location)
+            if full_source is not None:
+                self.set_source(source=full_source)
+            if full_type is not None:
+                self.set_type(full_type)
+            if interval_string is not None:
+                self.set_interval(interval_string=interval_string)
+            if scenario is not None:
+                self.set_scenario(scenario)
+
     def set_behavior_mask(self, behavior_mask):
         """
         Set the behavior mask. The behavior mask controls how identifier sub-parts are joined into the
@@ -788,6 +987,10 @@ class TSIdent(object):
         :param behavior_mask:
         """
         self.behavior_mask = behavior_mask
+        self._no_sub_location = (behavior_mask & TSIdent.NO_SUB_LOCATION) != 0
+        self._no_sub_source = (behavior_mask & TSIdent.NO_SUB_SOURCE) != 0
+        self._no_sub_type = (behavior_mask & TSIdent.NO_SUB_TYPE) != 0
+        self._no_validation = (behavior_mask & TSIdent.NO_VALIDATION) != 0
 
     def set_comment(self, comment):
         """
@@ -857,7 +1060,6 @@ class TSIdent(object):
         :param input_name: Input name
         :param tsident: TSIdent instance to copy
         """
-        logger = logging.getLogger(__name__)
 
         if (identifier is None) and (full_location is None) and (full_source is None) and (full_type is None) and \
             (interval_string is None) and (scenario is None) and (sequence_id is None) and \
@@ -870,12 +1072,12 @@ class TSIdent(object):
             # strings here...
 
             if self.debug:
-                logger.debug("Setting full identifier from parts: \"" + str(self.full_location) +
+                _logger.debug("Setting full identifier from parts: \"" + str(self.full_location) +
                     "." + str(self.full_source) + "." + str(self.full_type) +"." + str(self.interval_string) +
                     "." + str(self.scenario) + "~" + str(self.input_type) + "~" + str(self.input_name))
 
             if self.debug:
-                logger.debug("Calling get_identifier_from_parts..." )
+                _logger.debug("Calling get_identifier_from_parts..." )
             full_identifier = self.get_identifier_from_parts(location_type=self.location_type,
                                                              full_location=self.full_location,
                                                              full_source=self.full_source,
@@ -886,10 +1088,10 @@ class TSIdent(object):
                                                              input_type=self.input_type,
                                                              input_name=self.input_name)
             if self.debug:
-                logger.debug("...successfully called get_identifier_from_parts...")
+                _logger.debug("...successfully called get_identifier_from_parts...")
             self.set_full_identifier(full_identifier)
             if self.debug:
-                logging.debug("ID: \"" + str(self.identifier) + "\"")
+                _logger.debug("ID: \"" + str(self.identifier) + "\"")
 
         elif (identifier is not None) and (full_location is None) and (full_source is None) and \
              (full_type is None) and (interval_string is None) and (scenario is None) and (sequence_id is None) and \
@@ -900,30 +1102,30 @@ class TSIdent(object):
                 return
 
             if self.debug:
-                logger.debug("Trying to set identifier to \"" + identifier + "\"")
+                _logger.debug("Trying to set identifier to \"" + identifier + "\"")
 
             if len(identifier) == 0:
                 # Cannot parse the identifier because doing so would result in an infinite loop.
                 # If this routine is being called with an empty string, it is a mistake.
                 # The initialization code will call set_full_identifier() directly.
                 if self.debug:
-                    logger.debug("Identifier string is empty, not processing!")
+                    _logger.debug("Identifier string is empty, not processing!")
                 return
 
             # Parse the identifier using the public static function to create a temporary identifier object...
 
             if self.debug:
-                logger.debug("Done declaring temp TSIdent.")
-                logger.debug("Parsing identifier...")
+                _logger.debug("Done declaring temp TSIdent.")
+                _logger.debug("Parsing identifier...")
 
             tsident = TSIdent.parse_identifier(identifier, behavior_mask=self.behavior_mask)
             if self.debug:
-                logger.debug("...back from parsing identifier")
+                _logger.debug("...back from parsing identifier")
 
             # Now copy the temporary copy into this instance...
 
             if self.debug:
-                logger.debug("Setting the individual parts...")
+                _logger.debug("Setting the individual parts...")
                 self.set_location_type(tsident.get_location_type())
                 self.set_location(full_location=tsident.get_location())
                 self.set_source(source=tsident.get_source())
@@ -937,36 +1139,42 @@ class TSIdent(object):
                 (full_type is not None) and (interval_string is not None) and (scenario is not None) and \
                 (sequence_id is None) and (input_type is None) and (input_name is None):
             # set_identifier(full_location, full_source, full_type, interval_string, scenario)
-            self.set_location(full_location=full_location)
-            self.set_source(source=full_source)
-            self.set_type(full_type)
-            self.set_interval(interval_string)
-            self.set_scenario(scenario)
+            # Rebuild the identifier once after all parts are set.
+            with self.batch_update():
+                self.set_location(full_location=full_location)
+                self.set_source(source=full_source)
+                self.set_type(full_type)
+                self.set_interval(interval_string)
+                self.set_scenario(scenario)
         elif (identifier is None) and (full_location is not None) and (full_source is not None) and \
                 (full_type is not None) and (interval_string is not None) and (scenario is not None) and \
                 (sequence_id is None) and (input_type is not None) and (input_name is not None):
             # set_identifier(full_location, full_source, type, interval_string, scenario, input_type, input_name)
-            self.set_location(full_location=full_location)
-            self.set_source(source=full_source)
-            self.set_type(full_type)
-            self.set_interval(interval_string)
-            self.set_scenario(scenario)
-            self.set_input_type(input_type)
-            self.set_input_name(input_name)
+            # Rebuild the identifier once after all parts are set.
+            with self.batch_update():
+                self.set_location(full_location=full_location)
+                self.set_source(source=full_source)
+                self.set_type(full_type)
+                self.set_interval(interval_string)
+                self.set_scenario(scenario)
+                self.set_input_type(input_type)
+                self.set_input_name(input_name)
         elif (identifier is None) and (full_location is not None) and (full_source is not None) and \
                  (full_type is not None) and (interval_string is not None) and (scenario is not None) and \
                  (sequence_id is not None) and (input_type is not None) and (input_name is not None):
             # set_identifier(full_location, full_source, type, interval_string, scenario, sequence_id,
             # input_type, input_name)
             # All not None
-            self.set_location(full_location=full_location)
-            self.set_source(source=full_source)
-            self.set_type(full_type)
-            self.set_interval(interval_string)
-            self.set_scenario(scenario)
-            self.set_sequence_id(sequence_id)
-            self.set_input_type(input_type)
-            self.set_input_name(input_name)
+            # Rebuild the identifier once after all parts are set.
+            with self.batch_update():
+                self.set_location(full_location=full_location)
+                self.set_source(source=full_source)
+                self.set_type(full_type)
+                self.set_interval(interval_string)
+                self.set_scenario(scenario)
+                self.set_sequence_id(sequence_id)
+                self.set_input_type(input_type)
+                self.set_input_name(input_name)
         else:
             raise ValueError("Unsupported parameters for set_identifier(): " +
                              "identifier=" + str(identifier) +
@@ -996,6 +1204,53 @@ class TSIdent(object):
         if input_type is not None:
             self.input_type = input_type
 
+    def _compose(self, main, sub, separator, no_sub, set_full):
+        """
+        Set a full identifier part (location, source, or type) from its main and sub parts
+        and reset the full identifier.  This is called by set_location(), set_source(), and set_type().
+        :param main: The main part, which should always be set after the object is initialized.
+        :param sub: The sub part, which is only added if not an empty string
+        (it will be an empty string after the object is initialized).
+        :param separator: Separator between the main and sub parts.
+        :param no_sub: If True, use only the main part as the full part (see behavior mask).
+        :param set_full: Method to set the full part (e.g., set_full_location).
+        """
+        if main is not None:
+            set_full(TSIdent._get_full_part(main, sub, separator, no_sub))
+        # Now reset the full identifier...
+        if self._deferred == 0:
+            self.set_identifier()
+
+    @staticmethod
+    def _get_full_part(main, sub, separator, no_sub):
+        """
+        Return a full identifier part (location, source, or type) composed from its main and sub parts.
+        :param main: The main part.
+        :param sub: The sub part, which is only added if not an empty string.
+        :param separator: Separator between the main and sub parts.
+        :param no_sub: If True, use only the main part as the full part (see behavior mask).
+        :return: The full part.
+        """
+        if no_sub or not sub:
+            # Just use the main part as the full part...
+            return main
+        # Concatenate the main and sub parts to get the full part...
+        return f"{main}{separator}{sub}"
+
+    def _apply_interval(self, interval_base, interval_mult, interval_string):
+        """
+        Set the interval base, multiplier, and string without parsing the string, and reset the identifier.
+        The caller must ensure that the parts are consistent.
+        :param interval_base: Base interval (see TimeInterval.*)
+        :param interval_mult: Base interval multiplier.
+        :param interval_string: Data interval string.
+        """
+        self.interval_base = interval_base
+        self.interval_mult = interval_mult
+        self.set_interval_string(interval_string)
+        if self._deferred == 0:
+            self.set_identifier()
+
     def set_interval(self, interval_string=None, interval_base=None, interval_mult=None):
         """
         Set the interval given the interval string or base and multipler.
@@ -1008,68 +1263,43 @@ class TSIdent(object):
                 return
             if (interval_string != "*") and (len(interval_string) > 0):
                 # First split the string into its base and multiplier...
-                tsinterval = None
-                if (self.behavior_mask & TSIdent.NO_VALIDATION) == 0:
+                base_mult = None
+                if not self._no_validation:
                     try:
-                        tsinterval = TimeInterval.parse_interval(interval_string)
+                        base_mult = _parse_interval_cached(interval_string)
                     except:
                         # Not validating so let this pass...
                         pass
                 else:
-                    tsinterval = TimeInterval.parse_interval(interval_string)
+                    base_mult = _parse_interval_cached(interval_string)
 
                 # Now set the base and multiplier...
-                if tsinterval is not None:
-                    self.interval_base = tsinterval.get_base()
-                    self.interval_mult = tsinterval.get_multiplier()
+                if base_mult is not None:
+                    self.interval_base, self.interval_mult = base_mult
             # Else, don't do anything (leave as zero initialized values).
 
             # Now set the interval string. Use the given interval base string
             # because we need to preserve existing file names, etc.
             self.set_interval_string(interval_string)
-            self.set_identifier()
+            if self._deferred == 0:
+                self.set_identifier()
 
         elif (interval_base is not None) and (interval_mult is not None):
             # Set the interval using the interval base and multiplier
-            logger = logging.getLogger(__name__)
             if interval_mult <= 0:
-                logger.warning("Interval multiplier ({}) must be greater than zero".format(interval_mult))
-            if (interval_base != TimeInterval.SECOND) and \
-                    (interval_base != TimeInterval.MINUTE) and \
-                    (interval_base != TimeInterval.HOUR) and \
-                    (interval_base != TimeInterval.DAY) and \
-                    (interval_base != TimeInterval.WEEK) and \
-                    (interval_base != TimeInterval.MONTH) and \
-                    (interval_base != TimeInterval.YEAR) and \
-                    (interval_base != TimeInterval.IRREGULAR):
-                logger.warning("Base interval ({}) is not recognized".format(interval_base))
+                _logger.warning(f"Interval multiplier ({interval_mult}) must be greater than zero")
+            suffix = TSIdent._INTERVAL_SUFFIX.get(interval_base)
+            if suffix is None:
+                _logger.warning(f"Base interval ({interval_base}) is not recognized")
                 return
-            self.interval_base = interval_base
-            self.interval_mult = interval_mult
-
             # Now need to set the string representation of the interval...
-            interval_string = ""
             if (interval_base != TimeInterval.IRREGULAR) and (interval_mult != 1):
-                interval_string += interval_mult
-            if interval_base == TimeInterval.SECOND:
-                interval_string += "sec"
-            elif interval_base == TimeInterval.MINUTE:
-                interval_string += "min"
-            elif interval_base == TimeInterval.HOUR:
-                interval_string += "hour"
-            elif interval_base == TimeInterval.DAY:
-                interval_string += "day"
-            elif interval_base == TimeInterval.WEEK:
-                interval_string += "week"
-            elif interval_base == TimeInterval.MONTH:
-                interval_string += "month"
-            elif interval_base == TimeInterval.YEAR:
-                interval_string += "year"
-            elif interval_base == TimeInterval.IRREGULAR:
-                interval_string += "irreg"
+                interval_string = f"{interval_mult}{suffix}"
+            else:
+                interval_string = suffix
 
-            self.set_interval_string(interval_string)
-            self.set_identifier()
+            # The base and multiplier are known so there is no need to parse the interval string.
+            self._apply_interval(interval_base, interval_mult, interval_string)
         else:
             raise ValueError("Invalid parameters to set_interval")
 
@@ -1089,80 +1319,45 @@ class TSIdent(object):
         :param main_location: The main location string.
         :param sub_location: The sub location string.
         """
-        logger = logging.getLogger(__name__)
 
         if self.debug:
-            logger.debug("Resetting full location from parts...")
+            _logger.debug("Resetting full location from parts...")
         if (main_location is None) and (sub_location is None) and (full_location is None):
             # set_location()
             if self.debug:
-                logger.debug("Resetting location from saved parts")
-            if (self.behavior_mask & TSIdent.NO_SUB_LOCATION) != 0:
-                # Just use the main location as the full location...
-                if self.main_location is not None:
-                    # There should always be a main location after the object is initialized...
-                    self.set_full_location(self.main_location)
-            else:
-                # Concatenate the main and sub-locations to get the full location
-                full_location = ""
-                # We may want to check for main_location[] also...
-                if self.main_location is not None:
-                    # This should always be the case after the object is initialized...
-                    full_location += self.main_location
-                    if self.sub_location is not None:
-                        # We only want to add the sublocation if it is not
-                        # an empty string (it will be an empty string after the
-                        # object is initialized).
-                        if len(self.sub_location) > 0:
-                            # Have a sub_location so append it to the main location...
-                            full_location += TSIdent.LOCATION_SEPARATOR
-                            full_location += self.sub_location
-                    self.set_full_location(full_location)
-            # Now reset the full identifier...
-            self.set_identifier()
+                _logger.debug("Resetting location from saved parts")
+            self._compose(self.main_location, self.sub_location, TSIdent.LOCATION_SEPARATOR,
+                          self._no_sub_location, self.set_full_location)
         elif (main_location is not None) and (sub_location is not None):
             # Set the location from main and sub parts
             if self.debug:
-                logger.debug("Resetting location from main and sub")
+                _logger.debug("Resetting location from main and sub")
             self.set_main_location(main_location)
             self.set_sub_location(sub_location)
             # The full location will be set when the parts are set.
         elif (main_location is not None) and (sub_location is None):
             # Set the location from main and sub parts
             if self.debug:
-                logger.debug("Resetting location from main")
+                _logger.debug("Resetting location from main")
             self.set_main_location(main_location)
             # The full location will be set when the parts are set.
         elif full_location is not None:
             # Set the full location from its full string.
             if self.debug:
-                logger.debug("Resetting location from full location")
+                _logger.debug("Resetting location from full location")
 
             # if full_location is None:
             #    return
-            if (self.behavior_mask & TSIdent.NO_SUB_LOCATION) != 0:
+            if self._no_sub_location:
                 # The entire string passed in is used for the main location...
                 self.set_main_location(full_location)
             else:
                 # Need to split the location into main and sub-location...
-                sub_location = ""
-                part_list = StringUtil.break_string_list(full_location, TSIdent.LOCATION_SEPARATOR, 0)
-                nlist = len(part_list)
-                if nlist >= 1:
-                    # Set the main location...
-                    self.set_main_location(part_list[0])
-                if nlist >= 2:
-                    # Now set the sub-location. This allows for multiple delimited
-                    # parts (everything after the first delimiter is treated as the sublocation).
-                    iend = nlist - 1
-                    for i in range(iend + 1):
-                        if i != 1:
-                            sub_location += TSIdent.LOCATION_SEPARATOR
-                        sub_location += part_list[i]
-                    self.set_sub_location(sub_location)
-                else:
-                    # Since only setting the main location need to set the sub-location to an empty string...
-                    self.set_sub_location("")
+                # Split only on the first delimiter so that everything after it is the sub-location.
+                # If no delimiter, the sub-location is set to an empty string.
+                main_part, separator, sub_part = full_location.partition(TSIdent.LOCATION_SEPARATOR)
+                self.set_main_location(main_part)
+                self.set_sub_location(sub_part if separator else "")
         else:
             raise ValueError("Invalid parameters for set_location()")
 
@@ -1171,10 +1366,12 @@ class TSIdent(object):
         Set the location type.
         :param location_type: location type.
         """
-        if location_type is None:
+        if (location_type is None) or (location_type == self.location_type):
+            # Nothing to set, or no change so no need to reset the identifier
             return
         self.location_type = location_type
-        self.set_identifier()
+        if self._deferred == 0:
+            self.set_identifier()
 
     def set_main_location(self, main_location):
         """
@@ -1182,6 +1379,11 @@ class TSIdent(object):
         :param main_location: The location string.
         """
         if main_location is None:
+            # Nothing to set
+            return
+        if (main_location == self.main_location) and (self.full_location == TSIdent._get_full_part(
+                main_location, self.sub_location, TSIdent.LOCATION_SEPARATOR, self._no_sub_location)):
+            # No change, and the full part is current (the behavior mask may have changed), so no need to reset
             return
         self.main_location = main_location
         self.set_location()
@@ -1192,6 +1394,11 @@ class TSIdent(object):
         :param main_source: The main source string.
         """
         if main_source is None:
+            # Nothing to set
+            return
+        if (main_source == self.main_source) and (self.full_source == TSIdent._get_full_part(
+                main_source, self.sub_source, TSIdent.SOURCE_SEPARATOR, self._no_sub_source)):
+            # No change, and the full part is current (the behavior mask may have changed), so no need to reset
             return
         self.main_source = main_source
         self.set_source()
@@ -1202,6 +1409,11 @@ class TSIdent(object):
         :param main_type: The main data type string.
         """
         if main_type is None:
+            # Nothing to set
+            return
+        if (main_type == self.main_type) and (self.full_type == TSIdent._get_full_part(
+                main_type, self.sub_type, TSIdent.TYPE_SEPARATOR, self._no_sub_type)):
+            # No change, and the full part is current (the behavior mask may have changed), so no need to reset
             return
         self.main_type = main_type
         self.set_type()
@@ -1211,18 +1423,24 @@ class TSIdent(object):
         Set the scenario string
         :param scenario: The scenario string.
         """
-        if scenario is None:
+        if (scenario is None) or (scenario == self.scenario):
+            # Nothing to set, or no change so no need to reset the identifier
             return
         self.scenario = scenario
-        self.set_identifier()
+        if self._deferred == 0:
+            self.set_identifier()
 
     def set_sequence_id(self, sequence_id):
         """
         Set the sequence identifier, for example when the time series is part of an ensemble
         :param sequence_id: sequence identifier for the time series
         """
+        if sequence_id == self.sequence_id:
+            # No change so no need to reset the identifier
+            return
         self.sequence_id = sequence_id
-        self.set_identifier()
+        if self._deferred == 0:
+            self.set_identifier()
 
     def set_source(self, source=None, main_source=None, sub_source=None):
         """
@@ -1233,56 +1451,24 @@ class TSIdent(object):
         """
         if (source is None) and (main_source is None) and (sub_source is None):
             # set_source()
-            if (self.behavior_mask & TSIdent.NO_SUB_SOURCE) != 0:
-                # Just use the main source as the full source...
-                if self.main_source is not None:
-                    # There should always be a main source after the object is initialized...
-                    self.set_full_source(self.main_source)
-            else:
-                # Concatenate the main and sub-sources to get the full source.
-                full_source = ""
-                if self.main_source is not None:
-                    # We only want to add the subsource if it is not an empty
-                    # string (it will be an empty string after the object is initialized).
-                    full_source += self.main_source
-                    if self.sub_source is not None:
-                        # We have sub_source so append it to the main source...
-                        # We have a sub_source so append it to the main source...
-                        if len(self.sub_source) > 0:
-                            full_source += TSIdent.SOURCE_SEPARATOR
-                            full_source += self.sub_source
-                    self.set_full_source(full_source)
-            # Now reset the full identifier...
-            self.set_identifier()
+            self._compose(self.main_source, self.sub_source, TSIdent.SOURCE_SEPARATOR,
+                          self._no_sub_source, self.set_full_source)
             return
         elif (source is not None) and (main_source is None) and (sub_source is None):
             # set_source(source)
             if source == "":
                 self.set_main_source("")
                 self.set_sub_source("")
-            elif (self.behavior_mask & TSIdent.NO_SUB_SOURCE) != 0:
+            elif self._no_sub_source:
                 # The entire string passed in is used for the main source...
                 self.set_main_source(source)
             else:
                 # Need to split the source into main and sub-source...
-                sub_source = ""
-                part_list = StringUtil.break_string_list(source, TSIdent.SOURCE_SEPARATOR, 0)
-                nlist = len(part_list)
-                if nlist >= 1:
-                    # Set the main source...
-                    self.set_main_source(part_list[0])
-                if nlist >= 2:
-                    # Now set the sub-source...
-                    iend = nlist - 1
-                    for i in range(iend + 1):
-                        sub_source += part_list[i]
-                        if i != iend:
-                            sub_source += TSIdent.SOURCE_SEPARATOR
-                    self.set_sub_source(sub_source)
-                else:
-                    # Since we are only setting the main location we need
-                    # to set the sub-location to an empty string...
-                    self.set_sub_source("")
+                # Split only on the first delimiter so that everything after it is the sub-source.
+                # If no delimiter, the sub-source is set to an empty string.
+                main_part, separator, sub_part = source.partition(TSIdent.SOURCE_SEPARATOR)
+                self.set_main_source(main_part)
+                self.set_sub_source(sub_part if separator else "")
         elif (source is None) and (main_source is not None) and (sub_source is not None):
             # set_source(main_source, sub_source)
             self.set_main_source(main_source)
@@ -1296,7 +1482,8 @@ class TSIdent(object):
         Set the sub-source string (and reset the full source).
         :param sub_source: The sub-source string.
         """
-        if sub_source is None:
+        if (sub_source is None) or (sub_source == self.sub_source):
+            # Nothing to set, or no change so no need to reset the identifier
             return
         self.sub_source = sub_source
         self.set_source()
@@ -1306,7 +1493,8 @@ class TSIdent(object):
         Set the sub-location string (and reset the full location).
         :param sub_location: The sub-location string
         """
-        if sub_location is not None:
+        if (sub_location is None) or (sub_location == self.sub_location):
+            # Nothing to set, or no change so no need to reset the identifier
             return
         self.sub_location = sub_location
         self.set_location()
@@ -1316,7 +1504,8 @@ class TSIdent(object):
         Set the sub-type string (and reset the full data type).
         :param sub_type: The sub-type string.
         """
-        if sub_type is None:
+        if (sub_type is None) or (sub_type == self.sub_type):
+            # Nothing to set, or no change so no need to reset the identifier
             return
         self.sub_type = sub_type
         self.set_type()
@@ -1327,56 +1516,22 @@ class TSIdent(object):
         and set_sub_type() methods to reset full_type.
         :param type: the full data type string (optional)
         """
-        logger = logging.getLogger(__name__)
         if type is None:
             # set_type()
-            if (self.behavior_mask & TSIdent.NO_SUB_TYPE) != 0:
-                # Just use the main type as the full type...
-                if self.main_type is not None:
-                    # There should always be a main type after the object is initialized...
-                    self.set_full_type(self.main_type)
-            else:
-                # Concatenate the main and sub-types to get the full type.
-                full_type = ""
-                if self.main_type is not None:
-                    # This should always be the case after the object is initialized...
-                    full_type += self.main_type
-                    if self.sub_type is not None:
-                        # We only want to add the subtype if it is
-                        # not an empty string (it will be an empty string
-                        # after the object is initialized).
-                        if len(self.sub_type) > 0:
-                            # We have a sub type so append it to the main type...
-                            full_type += TSIdent.TYPE_SEPARATOR
-                            full_type += self.sub_type
-                    self.set_full_type(full_type)
-            # Now reset the full identifier...
-            self.set_identifier()
+            self._compose(self.main_type, self.sub_type, TSIdent.TYPE_SEPARATOR,
+                          self._no_sub_type, self.set_full_type)
         else:
             # set_type(type)
-            if (self.behavior_mask & TSIdent.NO_SUB_TYPE) != 0:
+            if self._no_sub_type:
                 # The entire string passed in is used for the main data type...
                 self.set_main_type(type)
             else:
                 # Need to split the data type into main and sub-locaiton...
-                sub_type = ""
-                part_list = StringUtil.break_string_list(type, TSIdent.TYPE_SEPARATOR, 0)
-                nlist = len(part_list)
-                if nlist >= 1:
-                    # Set the mian type...
-                    self.set_main_type(part_list[0])
-                if nlist >= 2:
-                    # Now set the sub-type...
-                    iend = nlist - 1
-                    for i in range(iend + 1):
-                        sub_type += part_list[i]
-                        if i != iend:
-                            sub_type += TSIdent.TYPE_SEPARATOR
-                    self.set_sub_type(sub_type)
-                else:
-                    # Since we are only setting the main type we
-                    # need to set the sub-type to an empty string...
-                    self.set_sub_type("")
+                # Split only on the first delimiter so that everything after it is the sub-type.
+                # If no delimiter, the sub-type is set to an empty string.
+                main_part, separator, sub_part = type.partition(TSIdent.TYPE_SEPARATOR)
+                self.set_main_type(main_part)
+                self.set_sub_type(sub_part if separator else "")
 
     def to_string(self, include_input=False):
         """
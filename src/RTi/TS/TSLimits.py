@@ -18,19 +18,47 @@
 #     You should have received a copy of the GNU General Public License
 #     along with CDSS Common Java Library.  If not, see <https://www.gnu.org/licenses/>.
 # NoticeEnd
+import array
+import bisect
+import datetime
+import itertools
 import logging
 import math
 
 # from RTi.TS.TSUtil import TSUtil
 from RTi.TS.DayTS import DayTS
 from RTi.TS.MonthTS import MonthTS
+from RTi.TS.TS import TS
 from RTi.TS.TSToArrayReturnType import TSToArrayReturnType
 from RTi.Util.Math.MathUtil import MathUtil
-from RTi.Util.String.StringUtil import StringUtil
 from RTi.Util.Time.DateTime import DateTime
 from RTi.Util.Time.TimeInterval import TimeInterval
 
 
+class _DateKeys(object):
+    """
+    Read-only sequence of the date comparison keys for irregular time series data points, used with bisect
+    to find the data points in a period.  The keys are computed only for the positions that are accessed.
+    """
+
+    __slots__ = ('data_array', 'precision')
+
+    def __init__(self, data_array, precision):
+        """
+        Construct the key sequence.
+        @param data_array List of data points, in date order.
+        @param precision DateTime precision to use for the comparison.
+        """
+        self.data_array = data_array
+        self.precision = precision
+
+    def __getitem__(self, index):
+        return self.data_array[index].get_date().get_comparison_key(self.precision)
+
+    def __len__(self):
+        return len(self.data_array)
+
+
 class TSLimits(object):
     """
     The TSLimits class stores information about the data and date limits of a time
@@ -43,6 +71,11 @@ class TSLimits(object):
     toString() method should be written to provide output suitable for use in a report.
     """
 
+    __slots__ = ('ts', 'date1', 'date2', 'flags', 'max_value', 'max_value_date', 'mean', 'median', 'min_value',
+                 'min_value_date', 'missing_data_count', 'non_missing_data_count', 'non_missing_data_date1',
+                 'non_missing_data_date2', 'skew', 'std_dev', 'sum', 'data_units', 'found', '_frozen',
+                 '_dates_set', '_stats_values', '_percents')
+
     # Flags used to indicate how limits are to be computed.
     # The following indicates that a time series' full limits should be refreshed.
     # This is generally used only by code internal to the TS library.
@@ -62,6 +95,50 @@ class TSLimits(object):
 	# value to be ignored but <= 0 is considered a common and special case.
     IGNORE_LESS_THAN_OR_EQUAL_ZERO = 0x8
 
+    # Time series property that, if True, indicates that the data values are in ascending order
+    # so that the minimum and maximum can be taken from the ends.
+    VALUES_SORTED_ASCENDING_PROPERTY = "values_sorted_ascending"
+
+    # Bits for the dates that have been set, used by check_dates().
+    _DATE1_SET = 0x1
+    _DATE2_SET = 0x2
+    _MAX_VALUE_DATE_SET = 0x4
+    _MIN_VALUE_DATE_SET = 0x8
+    _NON_MISSING_DATA_DATE1_SET = 0x10
+    _NON_MISSING_DATA_DATE2_SET = 0x20
+    _ALL_DATES_SET = 0x3F
+
+    # Time series class functions that calculate the data size for a data interval base,
+    # used by calculate_data_size().
+    _DATA_SIZE_FUNCTIONS = {
+        # TimeInterval.YEAR: YearTS.calculate_data_size,
+        TimeInterval.MONTH: MonthTS.calculate_data_size,
+        TimeInterval.DAY: DayTS.calculate_data_size
+        # TimeInterval.HOUR: HourTS.calculate_data_size,
+        # TimeInterval.MINUTE: MinuteTS.calculate_data_size,
+        # This will just count the data values in the period...
+        # TimeInterval.IRREGULAR: IrregularTS.calculate_data_size
+    }
+
+    # Functions that return the integer date/time value for a data interval base, used by to_array() when
+    # returning TSToArrayReturnType.DATE_TIME.
+    # TODO smalers 2020-01-04 need to enable for TimeInterval.DAY using DateTime.get_absolute_day()
+    _DATE_TIME_VALUE_FUNCTIONS = {
+        TimeInterval.YEAR: DateTime.get_year,
+        TimeInterval.MONTH: DateTime.get_absolute_month
+    }
+
+    # Number of values in each segment when computing the moments, used by _calculate_moments().
+    _MOMENTS_SEGMENT_SIZE = 4096
+
+    # Fixed length intervals and the corresponding datetime.timedelta keyword, used by _get_date_at().
+    _TIMEDELTA_UNITS = {
+        TimeInterval.MINUTE: "minutes",
+        TimeInterval.HOUR: "hours",
+        TimeInterval.DAY: "days",
+        TimeInterval.WEEK: "weeks"
+    }
+
     def __init__(self, limits=None):
         """
         Default constructor.  Initialize the dates to null and the limits to zeros.
@@ -85,12 +162,24 @@ class TSLimits(object):
         self.non_missing_data_date1 = None
         self.non_missing_data_date2 = None
         self.skew = None
-        self.stdDev = None
+        self.std_dev = None
         self.sum = None
         self.data_units=""  # Data units (just copy from TS at the time of creation).
 
         self.found = False
 
+        # Indicates whether the dates can be returned from getters without copying.
+        self._frozen = False
+
+        # Mask of _*_SET bits for the dates that have been set.
+        self._dates_set = 0
+
+        # Non-missing values used to compute the median, standard deviation, and skew when first requested.
+        self._stats_values = None
+
+        # Missing and non-missing data percentages and the counts they were computed from, used by to_string().
+        self._percents = None
+
         if limits is None:
             self.initialize()
         else:
@@ -99,26 +188,27 @@ class TSLimits(object):
             if limits.date1 is not None:
                 self.date1 = DateTime(date_time=limits.date1)
             if limits.date2 is not None:
-                date2 = DateTime(date_time=limits.date2)
+                self.date2 = DateTime(date_time=limits.date2)
             self.max_value = limits.max_value
             if limits.max_value_date is not None:
                 self.max_value_date = DateTime(date_time=limits.max_value_date)
             self.min_value = limits.min_value
             if limits.min_value_date is not None:
-                min_value_date = DateTime(date_time=limits.min_value_date)
+                self.min_value_date = DateTime(date_time=limits.min_value_date)
             if limits.non_missing_data_date1 is not None:
-                non_missing_data_date1 = DateTime(date_time=limits.non_missing_data_date1)
+                self.non_missing_data_date1 = DateTime(date_time=limits.non_missing_data_date1)
             if limits.non_missing_data_date2 is not None:
-                non_missing_data_date2 = DateTime(date_time=limits.non_missing_data_date2)
+                self.non_missing_data_date2 = DateTime(date_time=limits.non_missing_data_date2)
             self.non_missing_data_count = limits.non_missing_data_count
             self.missing_data_count = limits.missing_data_count
             self.mean = limits.mean
-            self.median = limits.median
+            self.median = limits.get_median()
             self.sum = limits.sum
             self.found = limits.found
+            self._dates_set = limits._dates_set
             self.flags = limits.flags
-            self.skew = limits.skew
-            self.std_dev = limits.std_dev
+            self.skew = limits.get_skew()
+            self.std_dev = limits.get_std_dev()
             self.ts = limits.ts
 
     def are_limits_found(self):
@@ -139,11 +229,13 @@ class TSLimits(object):
         @param refresh_flag Indicates whether the time series should be refreshed first
         (in general this is used only within the TS package and the version of this
         routine without the flag should be called).
+        After the limits are calculated, the date getters return the stored dates rather than copies,
+        so the returned dates must not be modified.
         """
-        max = 1.0
+        max_value = 1.0
         mean = 0.0
-        min = 0.0
-        sum = 0.0
+        min_value = 0.0
+        total = 0.0
         value = 0.0
         base = 0
         missing_count = 0
@@ -170,15 +262,12 @@ class TSLimits(object):
             # Initialize the sum and the mean...
 
             missing = ts.get_missing()
-            sum = missing
+            total = missing
             mean = missing
 
             # Get valid date limits because the ones passed in may have been null...
 
-            valid_dates = self.get_valid_period(ts, start0, end0)
-            start = valid_dates.get_date1()
-            end = valid_dates.get_date2()
-            valid_dates = None
+            start, end = TSLimits._get_valid_dates(ts, start0, end0)
 
             # Make sure that the time series has current limits...
 
@@ -188,233 +277,89 @@ class TSLimits(object):
                 # Force a refresh of the time series.
                 ts.refresh()
 
-            # Get the variables that are used often in this function.
-
-            ts_date1 = ts.get_date1()
-            ts_date2 = ts.get_date2()
-
             # Figure out if we are treating data <= 0 as missing...
 
             ignore_lezero = False
             if (self.flags & TSLimits.IGNORE_LESS_THAN_OR_EQUAL_ZERO) != 0:
                 ignore_lezero = True
 
+            # If the values are known to be sorted, the limits do not need to be searched for...
+            values_sorted = ts.get_property(TSLimits.VALUES_SORTED_ASCENDING_PROPERTY) is True
+
+            # Non-missing values, used to compute the moments and median...
+            valid_values = []
+
             # Loop through the dates and get max and min data values
             # TODO SAM 2010-06-15 Need to consolidate code to use iterator
 
-            if base == TimeInterval.IRREGULAR:
-                # Loop through the dates and get max and min data values
-                # Need to cast as an irregular TS...
-
-                # IrregularTS its = (IrregularTS)ts
-                its = ts
-
-                data_array = its.get_data
-                if data_array is None:
-                    message = "Null data for " + str(ts)
-                    logger.warning(message)
-                    # throw new TSException ( message )
-                    raise ValueError(message)
-                size = len(data_array)
-                ptr = None
-                for i in range(size):
-                    ptr = data_array[i]
-                    date = ptr.get_date()
-
-                    if date.less_than(ts_date1):
-                        # Still looking for data...
-                        continue
-                    elif date.greater_than(ts_date2):
-                        # No need to continue processing...
-                        break
-
-                    value = ptr.get_data_value()
-
-                    if ts.is_data_missing(value) or (ignore_lezero and (value <= 0.0)):
-                        # The value is missing
-                        missing_count += 1
-                        continue
-
-                    # Else, data value is not missing...
-
-                    if ts.is_data_missing(sum):
-                        # Reset the sum...
-                        sum = value
-                    else:
-                        # Add to the sum...
-                        sum += value
-                    non_missing_count += 1
-
-                    if found:
-                        # Already found the first non-missing point so
-                        # all we need to do is check the limits.  These
-                        # should only result in new DateTime a few times...
-                        if value > max:
-                            max = value
-                            max_date = DateTime(date_time=date)
-                        if value < min:
-                            min = value
-                            min_date = DateTime(date_time=date)
-                    else:
-                        # Set the limits to the first value found...
-                        # date = new DateTime ( t )
-                        max = value
-                        max_date = DateTime(date_time=date)
-                        min = value
-                        min_date = max_date
-                        non_missing_data_date1 = max_date
-                        non_missing_data_date2 = max_date
-                        found = True
-                        continue
-
-                # Now search backwards to find the first non-missing date...
-
-                if found:
-                    for i in range((size - 1), 0, -1):
-                        ptr = data_array[i]
-                        date = ptr.get_date()
-                        value = ptr.get_data_value()
-                        if date.greater_than(end):
-                            # Have not found data...
-                            continue
-                        elif date.less_than(start):
-                            # Passed start...
-                            break
-                        if (not ignore_lezero and not ts.is_data_missing(value)) or \
-                                (ignore_lezero and ((value > 0.0) and not ts.is_data_missing(value))):
-                            # Found the one date we are after...
-                            non_missing_data_date2 = DateTime(date_time=date)
-                            break
-            else:
-                # A regular TS... easier to iterate...
-                # First loop through and find the data limits and the minimum non-missing date...
-                t = DateTime(date_time=start, flag=DateTime.DATE_FAST)
-                # Python for loops are not as clean as original Java code
-                # for ( ; t.lessThanOrEqualTo(end); t.addInterval( base, mult )) {
-                first_iteration = True
-                while t.less_than_or_equal_to(end):
-                    if first_iteration:
-                        first_iteration = False
-                    else:
-                        t.add_interval(base, mult)
-
-                    value = ts.get_data_value(t)
-
-                    if ts.is_data_missing(value) or (ignore_lezero and (value <= 0.0)):
-                        # The value is missing
-                        missing_count += 1
-                        continue
-
-                    # Else, data value is not missing...
-
-                    if ts.is_data_missing(sum):
-                        # Reset the sum...
-                        sum = value
-                    else:
-                        # Add to the sum...
-                        sum += value
-                    non_missing_count += 1
-
-                    if found:
-                        # Already found the first non-missing point so
-                        # all we need to do is check the limits.  These
-                        # should only result in new DateTime a few times...
-                        if value > max:
-                            max = value
-                            max_date = DateTime(date_time=t)
-                        if value < min:
-                            min = value
-                        min_date = DateTime(date_time=t)
-                    else:
-                        # First non-missing point so set the initial values...
-                        date = DateTime(date_time=t)
-                        max = value
-                        max_date = date
-                        min = value
-                        min_date = date
-                        non_missing_data_date1 = date
-                        non_missing_data_date2 = date
-                        found = True
-                # Now loop backwards and find the last non-missing value...
-                t = DateTime(date_time=end, flag=DateTime.DATE_FAST)
-                if found:
-                    # for(; t.greaterThanOrEqualTo(start); t.addInterval( base, -mult )) {
-                    first_iteration = True
-                    while t.greater_than_or_equal_to(start):
-                        if first_iteration:
-                            first_iteration = False
-                        else:
-                            t.add_interval(base, -mult)
-                        value = ts.get_data_value(t)
-                        if (not ignore_lezero and not ts.is_data_missing(value)) or \
-                                (ignore_lezero and ((value > 0.0) and not ts.is_data_missing(value))):
-                            # The value is not missing...
-                            non_missing_data_date2 = DateTime(date_time=t)
-                            break
-
-            # TODO SAM 2010-06-15 This is a performance hit, but not too bad
+            # Extract the values with the function for the interval base (regular time series
+            # by default), and then reduce them...
+            extract_values = TSLimits._VALUE_EXTRACTORS.get(base, TSLimits._extract_regular_values)
+            values, get_date = extract_values(ts, start, end, base, mult)
+            valid, valid_values, imax, imin = TSLimits._reduce_values(
+                values, ts.is_data_missing, ignore_lezero, values_sorted, TSLimits._get_missing_range(ts))
+            non_missing_count = len(valid)
+            missing_count = len(values) - non_missing_count
+            if non_missing_count > 0:
+                total = sum(valid_values)
+                max_value = values[imax]
+                min_value = values[imin]
+                # Dates are only created for the positions that are needed.
+                max_date = get_date(imax)
+                min_date = get_date(imin)
+                # The last non-missing date is known from the positions so no backward search is needed.
+                non_missing_data_date1 = get_date(valid[0])
+                non_missing_data_date2 = get_date(valid[-1])
+                found = True
+
             # TODO SAM 2010-06-15 Consider treating other statistics similarly but need to define unit tests
             # TODO SAM 2010-06-15 This code would need to be changed if doing Lag-1 correlation because order matters
-            # For newly added statistics, use helper method to get data, ignoring missing...
-            data_array = self.to_array(ts, start, end, 0, False)
-            # Check for <= 0 values if necessary
-            n_data_array = len(data_array)
-            if ignore_lezero:
-                for i in range(n_data_array):
-                    if data_array[i] <= 0.0:
-                        # Just exchange with the last value and reduce the size
-                        temp = data_array[i]
-                        data_array[i] = data_array[n_data_array - 1]
-                        data_array[n_data_array - 1] = temp
-                        n_data_array -= 1
-
-            if n_data_array > 0:
-                self.set_median(MathUtil.median(n_data_array, data_array))
-
-            if n_data_array > 1:
-                try:
-                    self.set_std_dev(MathUtil.standard_deviation(n_data_array, data_array))
-                except Exception as e:
-                    # Likely due to small sample size
-                    pass
-            if n_data_array > 2:
-                try:
-                    self.set_skew(MathUtil.skew(n_data_array, data_array))
-                except Exception as e:
-                    # Likely due to small sample size
-                    pass
+            # For newly added statistics, keep the non-missing values that were already filtered above
+            # (excluding values <= 0 if requested).  The median, standard deviation, and skew are computed
+            # from these values when first requested (see get_median(), get_std_dev(), and get_skew())...
+            self._stats_values = valid_values
+            self.median = None
+            self.std_dev = None
+            self.skew = None
 
             if not found:
-                message = "\"" + ts.getIdentifierString() + "\": problems finding limits, whole POR missing!"
+                message = "\"" + ts.get_identifier_string() + "\": problems finding limits, whole POR missing!"
                 logger.warning(message)
                 # throw new TSException ( message )
                 raise ValueError(message)
 
             if debug:
                 logger.debug("Overall date limits are: " + str(start) + " to " + str(end))
-                logger.debug("Found limits to be: " + str(min) + " on " + str(min_date) + " to " + str(max) +
-                             " on " + str(max_date))
+                logger.debug("Found limits to be: " + str(min_value) + " on " + str(min_date) + " to " +
+                             str(max_value) + " on " + str(max_date))
                 logger.debug("Found non-missing data dates to be: " + str(non_missing_data_date1) + " -> " +
                              str(non_missing_data_date2))
 
-            # Set the basic information...
-
-            self.set_date1(start)
-            self.set_date2(end)
-            self.set_max_value(max, max_date)
-            self.set_min_value(min, min_date)
-            self.set_non_missing_data_date1(non_missing_data_date1)
-            self.set_non_missing_data_date2(non_missing_data_date2)
+            # Set the basic information.  The dates were created above for the limits so they are not copied...
+
+            self._set_date("date1", TSLimits._DATE1_SET, start, False)
+            self._set_date("date2", TSLimits._DATE2_SET, end, False)
+            self.set_max_value(max_value)
+            self._set_date("max_value_date", TSLimits._MAX_VALUE_DATE_SET, max_date, False)
+            self.set_min_value(min_value)
+            self._set_date("min_value_date", TSLimits._MIN_VALUE_DATE_SET, min_date, False)
+            self._set_date("non_missing_data_date1", TSLimits._NON_MISSING_DATA_DATE1_SET, non_missing_data_date1,
+                           False)
+            self._set_date("non_missing_data_date2", TSLimits._NON_MISSING_DATA_DATE2_SET, non_missing_data_date2,
+                           False)
+            self.check_dates()
             self.set_missing_data_count(missing_count)
             self.set_non_missing_data_count(non_missing_count)
             # //int data_size = calculate_data_size(ts, start, end)
             # //limits.set_non_missing_data_count(data_size - missing_count)
-            if not ts.is_data_missing(sum) and (non_missing_count > 0):
-                mean = sum/float(non_missing_count)
+            if not ts.is_data_missing(total) and (non_missing_count > 0):
+                mean = total/float(non_missing_count)
             else:
                 mean = missing
-            self.set_sum(sum)
+            self.set_sum(total)
             self.set_mean(mean)
+            # The dates are not modified after this point so getters can return them without copying.
+            self._frozen = True
         except Exception as e:
             message = "Error computing limits."
             logger.warning(message)
@@ -424,6 +369,357 @@ class TSLimits(object):
             # throw new TSException ( message )
             raise Exception(message)
 
+    @staticmethod
+    def _extract_irregular_values(ts, start, end, interval_base, interval_mult):
+        """
+        Extract the data values for an irregular time series, used by calculate_data_limits().
+        The values in the period of the time series are extracted, and the dates are only copied
+        for the positions that are requested.
+        @return tuple (values, get_date), where values is the list of data values (including missing values)
+        and get_date is a function that returns a new DateTime for a position in the values.
+        @param ts Irregular time series to process.
+        @param start Starting date for the check (not used, the time series period is used).
+        @param end Ending date for the check (not used, the time series period is used).
+        @param interval_base Interval base for the time series (not used).
+        @param interval_mult Interval multiplier for the time series (not used).
+        """
+        # IrregularTS its = (IrregularTS)ts
+        its = ts
+
+        data_array = its.get_data()
+        if data_array is None:
+            message = "Null data for " + str(ts)
+            logging.getLogger(__name__).warning(message)
+            # throw new TSException ( message )
+            raise ValueError(message)
+        if len(data_array) == 0:
+            return [], None
+        # The data points are in date order so find the first and last points in the period with a binary search...
+        keys = _DateKeys(data_array, data_array[0].get_date().precision)
+        first = bisect.bisect_left(keys, ts.get_date1().get_comparison_key(keys.precision))
+        last = bisect.bisect_right(keys, ts.get_date2().get_comparison_key(keys.precision))
+        points = data_array[first:last]
+        values = [ptr.get_data_value() for ptr in points]
+        return values, lambda index: DateTime(date_time=points[index].get_date())
+
+    @staticmethod
+    def _extract_regular_values(ts, start, end, interval_base, interval_mult):
+        """
+        Extract the data values for a regular time series, used by calculate_data_limits().
+        @return tuple (values, get_date), where values is the list of data values (including missing values)
+        and get_date is a function that returns a new DateTime for a position in the values.
+        @param ts Regular time series to process.
+        @param start Starting date for the check.
+        @param end Ending date for the check.
+        @param interval_base Interval base for the time series.
+        @param interval_mult Interval multiplier for the time series.
+        """
+        # The time series can return the values for the period without a call for each date...
+        values = ts.get_values_range(start, end)
+        return values, lambda index: TSLimits._get_date_at(start, interval_base, interval_mult, index)
+
+    # Functions to extract the data values for interval bases that are not handled as regular time series,
+    # used by calculate_data_limits() to look up the extraction function for the interval.
+    _VALUE_EXTRACTORS = {
+        TimeInterval.IRREGULAR: _extract_irregular_values.__func__
+    }
+
+    @staticmethod
+    def _get_non_missing_values(values, is_data_missing, missing_range=None):
+        """
+        Return the non-missing values, used by to_array() when no other criteria are checked.
+        @return list of the non-missing values, in order.
+        @param values Data values, including missing values.
+        @param is_data_missing Function that returns True if a value is missing.
+        @param missing_range tuple (lower, upper) of the missing data range to check directly rather than
+        calling is_data_missing(), or None (see _get_missing_range()).
+        """
+        if missing_range is not None:
+            missingl, missingu = missing_range
+            return [value for value in values if (value == value) and not (missingl <= value <= missingu)]
+        return [value for value in values if not is_data_missing(value)]
+
+    @staticmethod
+    def _select_positions(values, months, include_months_mask, is_data_missing, include_missing, missing_range=None):
+        """
+        Select the positions of the values to transfer, used by to_array().  The month and missing data
+        criteria are checked together in a single pass over the values.
+        @return list (or range) of the selected positions.
+        @param values Data values, including missing values.
+        @param months Iterable of the month (1-12) for each value, or None if all months are included.
+        @param include_months_mask Mask indicating whether each month (index 0=Jan) is included.
+        @param is_data_missing Function that returns True if a value is missing.
+        @param include_missing Indicates whether missing values should be included.
+        @param missing_range tuple (lower, upper) of the missing data range to check directly rather than
+        calling is_data_missing(), or None (see _get_missing_range()).
+        """
+        if months is None:
+            if include_missing:
+                return range(len(values))
+            if missing_range is not None:
+                missingl, missingu = missing_range
+                return [i for i, value in enumerate(values) if (value == value) and not (missingl <= value <= missingu)]
+            return [i for i, value in enumerate(values) if not is_data_missing(value)]
+        if include_missing:
+            return [i for i, month in enumerate(months) if include_months_mask[month - 1]]
+        if missing_range is not None:
+            missingl, missingu = missing_range
+            return [i for i, (value, month) in enumerate(zip(values, months))
+                    if include_months_mask[month - 1] and (value == value) and not (missingl <= value <= missingu)]
+        return [i for i, (value, month) in enumerate(zip(values, months))
+                if include_months_mask[month - 1] and not is_data_missing(value)]
+
+    @staticmethod
+    def _filter_paired_positions(positions, values, values2, is_data_missing, is_data_missing2,
+                                 match_other_nonmissing):
+        """
+        Select the positions to transfer when extracting data using a paired time series, used by to_array().
+        The value in the time series must be non-missing.  A separate comprehension is used for each
+        match_other_nonmissing setting so that the setting is not checked for each value.
+        @return list of the selected positions.
+        @param positions Positions to check, in order.
+        @param values Data values for the time series.
+        @param values2 Data values for the paired time series, for the same dates.
+        @param is_data_missing Function that returns True if a value in the time series is missing.
+        @param is_data_missing2 Function that returns True if a value in the paired time series is missing.
+        @param match_other_nonmissing If True, select positions where the paired value is also non-missing.
+        If False, select positions where the paired value is missing.
+        """
+        if match_other_nonmissing:
+            # Want non-missing in both "ts" and "paired_ts"
+            return [i for i in positions if not (is_data_missing(values[i]) or is_data_missing2(values2[i]))]
+        else:
+            # Want non-missing in "ts" and missing in "paired_ts"
+            return [i for i in positions if not is_data_missing(values[i]) and is_data_missing2(values2[i])]
+
+    @staticmethod
+    def _get_months(start, interval_base, interval_mult, size):
+        """
+        Return the month (1-12) for each date in a regular interval period, used by to_array().
+        The months are computed from the position rather than by incrementing a DateTime for each date,
+        and are generated as they are used so that a list for the full period is not created.
+        @return iterable of the month for each position in the period.
+        @param start Starting date of the period.
+        @param interval_base Interval base for the period.
+        @param interval_mult Interval multiplier for the period.
+        @param size Number of dates in the period.
+        """
+        if interval_base == TimeInterval.MONTH:
+            # The months repeat every 12 positions...
+            month0 = start.month - 1
+            return itertools.islice(itertools.cycle([(month0 + interval_mult*i) % 12 + 1 for i in range(12)]), size)
+        elif interval_base == TimeInterval.YEAR:
+            return itertools.repeat(start.month, size)
+        timedelta_unit = TSLimits._TIMEDELTA_UNITS.get(interval_base)
+        if timedelta_unit is not None:
+            # Fixed length interval so use the standard library date arithmetic...
+            dt = datetime.datetime(start.year, start.month, start.day, start.hour, start.minute)
+            delta = datetime.timedelta(**{timedelta_unit: interval_mult})
+            return ((dt + delta*i).month for i in range(size))
+        return TSLimits._generate_months(start, interval_base, interval_mult, size)
+
+    @staticmethod
+    def _generate_months(start, interval_base, interval_mult, size):
+        """
+        Generate the month (1-12) for each date in a regular interval period by incrementing a DateTime,
+        used by _get_months() for intervals that are not handled directly.
+        @param start Starting date of the period.
+        @param interval_base Interval base for the period.
+        @param interval_mult Interval multiplier for the period.
+        @param size Number of dates in the period.
+        """
+        date = DateTime(date_time=start)
+        add_interval = date.add_interval
+        for i in range(size):
+            yield date.month
+            add_interval(interval_base, interval_mult)
+
+    @staticmethod
+    def _get_missing_range(ts):
+        """
+        Return the missing data range for a time series so that values can be checked without calling
+        is_data_missing() for each value.  This is only possible if the time series uses the TS.is_data_missing()
+        check, which treats NaN and values in the range as missing.
+        @return tuple (lower, upper) of the missing data range, or None if is_data_missing() must be called.
+        @param ts Time series to check.
+        """
+        if getattr(type(ts), "is_data_missing", None) is TS.is_data_missing:
+            return ts.missingl, ts.missingu
+        return None
+
+    @staticmethod
+    def _get_date_at(start, interval_base, interval_mult, index):
+        """
+        Return the date/time for a position in a regular time series.
+        The date/time is computed directly rather than adding one interval at a time, which for
+        DateTime.add_interval() is proportional to the number of intervals.
+        @return A new DateTime that is index intervals after start.
+        @param start Date/time for position zero.
+        @param interval_base The time series data interval base.
+        @param interval_mult The time series data interval multiplier.
+        @param index Position of the date/time of interest.
+        """
+        date = DateTime(date_time=start)
+        if index == 0:
+            return date
+        timedelta_unit = TSLimits._TIMEDELTA_UNITS.get(interval_base)
+        if timedelta_unit is not None:
+            # Fixed length interval so offset using the standard library date arithmetic...
+            dt = datetime.datetime(date.year, date.month, date.day, date.hour, date.minute) + \
+                datetime.timedelta(**{timedelta_unit: interval_mult*index})
+            date.year = dt.year
+            date.month = dt.month
+            date.day = dt.day
+            date.hour = dt.hour
+            date.minute = dt.minute
+        elif interval_base == TimeInterval.MONTH:
+            # Offset the absolute month (the day is not adjusted, consistent with DateTime.add_month())...
+            year, month0 = divmod(date.year*12 + (date.month - 1) + interval_mult*index, 12)
+            date.year = year
+            date.month = month0 + 1
+        elif interval_base == TimeInterval.YEAR:
+            date.year += interval_mult*index
+        else:
+            date.add_interval(interval_base, interval_mult*index)
+            return date
+        date.reset()
+        date.iszero = False
+        return date
+
+    @staticmethod
+    def _calculate_moments(values):
+        """
+        Calculate the mean and the sums of squared and cubed deviations from the mean.
+        The values are processed in segments of _MOMENTS_SEGMENT_SIZE values.  The deviations within each
+        segment are taken from the segment mean (two passes over a short list, using the built-in sum()),
+        and the segments are then combined with _merge_moments().  Unlike accumulating the sums of
+        x, x^2 and x^3, this does not lose precision when the values are large relative to their
+        spread.  The mean returned here is not used for TSLimits.mean, which is still sum/count so that
+        results agree with previous versions.
+        @return tuple (count, mean, m2, m3) where m2 and m3 are the sums of squared and cubed deviations.
+        @param values Non-missing data values.
+        """
+        moments = (0, 0.0, 0.0, 0.0)
+        segment_size = TSLimits._MOMENTS_SEGMENT_SIZE
+        for i in range(0, len(values), segment_size):
+            segment = values[i:i + segment_size]
+            n = len(segment)
+            mean = sum(segment)/n
+            deviations = [value - mean for value in segment]
+            squares = [deviation*deviation for deviation in deviations]
+            m2 = sum(squares)
+            m3 = sum([square*deviation for square, deviation in zip(squares, deviations)])
+            moments = TSLimits._merge_moments(moments, (n, mean, m2, m3))
+        return moments
+
+    @staticmethod
+    def _merge_moments(moments_a, moments_b):
+        """
+        Combine the moments of two sets of values using the pairwise formulas of Chan, Golub, and LeVeque,
+        extended to the third moment.  The sets can be computed independently (e.g., for segments of the data).
+        @return tuple (count, mean, m2, m3) for the combined values.
+        @param moments_a tuple (count, mean, m2, m3) for the first set of values.
+        @param moments_b tuple (count, mean, m2, m3) for the second set of values.
+        """
+        n_a, mean_a, m2_a, m3_a = moments_a
+        n_b, mean_b, m2_b, m3_b = moments_b
+        if n_a == 0:
+            return moments_b
+        if n_b == 0:
+            return moments_a
+        n = n_a + n_b
+        delta = mean_b - mean_a
+        delta_n = delta/n
+        mean = mean_a + delta_n*n_b
+        m2 = m2_a + m2_b + delta*delta_n*n_a*n_b
+        m3 = (m3_a + m3_b + delta*delta_n*delta_n*n_a*n_b*(n_a - n_b) +
+              3.0*delta_n*(n_a*m2_b - n_b*m2_a))
+        return n, mean, m2, m3
+
+    @staticmethod
+    def _reduce_values(values, is_data_missing, ignore_lezero, values_sorted=False, missing_range=None):
+        """
+        Find the non-missing values and the positions of the maximum and minimum values.
+        This is the inner loop of calculate_data_limits(), separate from the date iteration, and uses
+        list comprehensions and the built-in max() and min() so that the loops run in C.
+        @return tuple (valid, valid_values, imax, imin), where valid is the list of positions of the
+        non-missing values, valid_values is the list of non-missing values, and imax and imin are the
+        positions of the first maximum and minimum values (None if all values are missing).
+        @param values List of data values, including missing values.
+        @param is_data_missing Function that returns True if a value is missing.
+        @param ignore_lezero Indicates whether values <= 0 should be treated as missing.
+        @param values_sorted Indicates whether the values are in ascending order, in which case the
+        minimum and maximum are found at the ends of the non-missing values without a search.
+        @param missing_range tuple (lower, upper) of the missing data range to check directly rather than
+        calling is_data_missing(), or None (see _get_missing_range()).
+        """
+        # Use a separate comprehension for each case so that the flag is not checked for each value.
+        # A value that is not equal to itself is NaN, which is always treated as missing.
+        if missing_range is not None:
+            missingl, missingu = missing_range
+            if ignore_lezero:
+                valid = [i for i, value in enumerate(values)
+                         if (value == value) and not (missingl <= value <= missingu) and (value > 0.0)]
+            else:
+                valid = [i for i, value in enumerate(values)
+                         if (value == value) and not (missingl <= value <= missingu)]
+        elif ignore_lezero:
+            valid = [i for i, value in enumerate(values) if not (is_data_missing(value) or (value <= 0.0))]
+        else:
+            valid = [i for i, value in enumerate(values) if not is_data_missing(value)]
+        if len(valid) == 0:
+            return valid, [], None, None
+        valid_values = [values[i] for i in valid]
+        if values_sorted:
+            # The minimum is the first non-missing value.  The maximum is the last, but use the first
+            # of any equal values at the end for consistency with the search below.
+            imin = valid[0]
+            imax = valid[bisect.bisect_left(valid_values, valid_values[-1])]
+            return valid, valid_values, imax, imin
+        # Find each position with one pass of max() or min() keyed on the value.  The first position is
+        # returned for ties, consistent with replacing a limit only by a larger or smaller value.
+        get_value = values.__getitem__
+        imax = max(valid, key=get_value)
+        imin = min(valid, key=get_value)
+        return valid, valid_values, imax, imin
+
+    def _calculate_median(self):
+        """
+        Compute the median from the values saved by calculate_data_limits().
+        """
+        values = self._stats_values
+        if len(values) > 0:
+            self.median = MathUtil.median(len(values), values)
+        else:
+            self.median = math.nan
+        self._release_stats_values()
+
+    def _calculate_std_dev_and_skew(self):
+        """
+        Compute the standard deviation and skew from the values saved by calculate_data_limits().
+        Both are computed from the same moments so are set together.
+        """
+        std_dev = math.nan
+        skew = math.nan
+        n, _, m2, m3 = TSLimits._calculate_moments(self._stats_values)
+        if n > 1:
+            std_dev = math.sqrt(m2/(n - 1))
+            if (n > 2) and (std_dev > 0.0):
+                skew = n*m3/((n - 1)*(n - 2)*std_dev**3)
+        # Do not replace a value that was set with a setter.
+        if self.std_dev is None:
+            self.std_dev = std_dev
+        if self.skew is None:
+            self.skew = skew
+        self._release_stats_values()
+
+    def _release_stats_values(self):
+        """
+        Release the values saved by calculate_data_limits() once all the statistics that need them are computed.
+        """
+        if (self.median is not None) and (self.std_dev is not None) and (self.skew is not None):
+            self._stats_values = None
+
     def calculate_data_size(self, start_date, end_date, interval_base, interval_mult):
         """
         Determine the data size for a time series for a period.  If an IrregularTS
@@ -445,24 +741,13 @@ class TSLimits(object):
         if end_date is None:
             logger.warning("End date is null")
             return 0
-        if interval_base == TimeInterval.YEAR:
-            # return YearTS.calculateDataSize ( start_date, end_date, interval_mult;
-            pass
-        elif interval_base == TimeInterval.MONTH:
-            return MonthTS.calculate_data_size(start_date, end_date, interval_mult)
-        elif interval_base == TimeInterval.DAY:
-            return DayTS.calculate_data_size(start_date, end_date, interval_mult)
-        # elif ( interval_base == TimeInterval.HOUR ):
-        #     return HourTS.calculateDataSize(start_date, end_date, interval_mult)
-        # elif interval_base == TimeInterval.MINUTE:
-        #     return MinuteTS.calculateDataSize(start_date, end_date, interval_mult)
-        # elif interval_base == TimeInterval.IRREGULAR:
-        #     # This will just count the data values in the period...
-        #     return IrregularTS.calculateDataSize(start_date, end_date, interval_mult)
-        else:
+        # Look up the time series class function for the interval...
+        calculate_data_size = TSLimits._DATA_SIZE_FUNCTIONS.get(interval_base)
+        if calculate_data_size is None:
             # Interval is not supported.  Big problem!
-            logger.warning("Time series interval " + interval_base + " is not supported")
+            logger.warning("Time series interval " + str(interval_base) + " is not supported")
             return 0
+        return calculate_data_size(start_date, end_date, interval_mult)
 
     def check_dates(self):
         """
@@ -470,12 +755,34 @@ class TSLimits(object):
         _found flag to true.  If a TSLimits is being used for something other than fill
         limits analysis, then external code may need to call setLimitsFound() to manually set the found flag.
         """
-        if (self.date1 is not None) and (self.date2 is not None) and \
-            (self.max_value_date is not None) and (self.min_value_date is not None) and \
-                (self.non_missing_data_date1 is not None) and (self.non_missing_data_date2 is not None):
+        # The setters record each date that is set in a bit mask so only one comparison is needed.
+        if self._dates_set == TSLimits._ALL_DATES_SET:
             # The dates have been fully processed (set)...
             self.found = True
 
+    def _get_date(self, date):
+        """
+        Return a date for one of the date getters.  If the limits have been frozen by calculate_data_limits(),
+        the stored date is returned without copying, and the caller must not modify it.  Otherwise, a copy
+        of the date is returned to protect the limits from changes.
+        @return The date, a copy of the date, or None if the date is not set.
+        @param date The stored date.
+        """
+        if self._frozen:
+            return date
+        return TSLimits._copy_date(date)
+
+    @staticmethod
+    def _copy_date(date):
+        """
+        Return a copy of a stored date.
+        @return A copy of the date, or None if the date is not set.
+        @param date The stored date.
+        """
+        if date is None:
+            return None
+        return DateTime(date_time=date)
+
     def get_data_units(self):
         """
         Return the data units for the data limits.
@@ -486,23 +793,35 @@ class TSLimits(object):
         """
         Return the first date for the time series according to the memory allocation.
         @return The first date for the time series according to the memory allocation.
-        A copy of the date is returned.
+        A copy of the date is returned unless the limits are frozen (see calculate_data_limits()),
+        in which case the stored date is returned and must not be modified.
+        Use get_date1_copy() to get a date that can be modified.
         """
-        if self.date1 is None:
-            return self.date1
-        else:
-            return DateTime(date_time=self.date1)
+        return self._get_date(self.date1)
+
+    def get_date1_copy(self):
+        """
+        Return a copy of the first date for the time series, which the caller can modify.
+        @return A copy of the first date for the time series, or None if not set.
+        """
+        return TSLimits._copy_date(self.date1)
 
     def get_date2(self):
         """
         Return the last date for the time series according to the memory allocation.
         @return The last date for the time series according to the memory allocation.
-        A copy of the date is returned.
+        A copy of the date is returned unless the limits are frozen (see calculate_data_limits()),
+        in which case the stored date is returned and must not be modified.
+        Use get_date2_copy() to get a date that can be modified.
         """
-        if self.date2 is None:
-            return self.date2
-        else:
-            return DateTime(date_time=self.date2)
+        return self._get_date(self.date2)
+
+    def get_date2_copy(self):
+        """
+        Return a copy of the last date for the time series, which the caller can modify.
+        @return A copy of the last date for the time series, or None if not set.
+        """
+        return TSLimits._copy_date(self.date2)
 
     def get_max_value(self):
         """
@@ -515,12 +834,18 @@ class TSLimits(object):
         """
         Return the date corresponding to the maximum data value for the time series.
         @return The date corresponding to the maximum data value for the time series.
-        A copy of the date is returned.
+        A copy of the date is returned unless the limits are frozen (see calculate_data_limits()),
+        in which case the stored date is returned and must not be modified.
+        Use get_max_value_date_copy() to get a date that can be modified.
         """
-        if self.max_value_date is None:
-            return self.max_value_date
-        else:
-            return DateTime(date_time=self.max_value_date)
+        return self._get_date(self.max_value_date)
+
+    def get_max_value_date_copy(self):
+        """
+        Return a copy of the date corresponding to the maximum data value, which the caller can modify.
+        @return A copy of the date corresponding to the maximum data value, or None if not set.
+        """
+        return TSLimits._copy_date(self.max_value_date)
 
     def get_mean(self):
         """
@@ -534,6 +859,8 @@ class TSLimits(object):
         Return the median data value for the time series.
         @return The median data value for the time series, or NaN if not computed.
         """
+        if self.median is None:
+            self._calculate_median()
         return self.median
 
     def get_min_value(self):
@@ -547,12 +874,18 @@ class TSLimits(object):
         """
         Return the date corresponding to the minimum data value for the time series.
         @return The date corresponding to the minimum data value for the time series.
-        A copy of the date is returned.
+        A copy of the date is returned unless the limits are frozen (see calculate_data_limits()),
+        in which case the stored date is returned and must not be modified.
+        Use get_min_value_date_copy() to get a date that can be modified.
         """
-        if self.min_value_date is None:
-            return self.min_value_date
-        else:
-            return DateTime(date_time=self.min_value_date)
+        return self._get_date(self.min_value_date)
+
+    def get_min_value_date_copy(self):
+        """
+        Return a copy of the date corresponding to the minimum data value, which the caller can modify.
+        @return A copy of the date corresponding to the minimum data value, or None if not set.
+        """
+        return TSLimits._copy_date(self.min_value_date)
 
     def get_missing_data_count(self):
         """
@@ -572,23 +905,35 @@ class TSLimits(object):
         """
         Return the date corresponding to the first non-missing data in the time series.
         @return The date corresponding to the first non-missing data in the time series.
-        A copy of the date is returned.
+        A copy of the date is returned unless the limits are frozen (see calculate_data_limits()),
+        in which case the stored date is returned and must not be modified.
+        Use get_non_missing_data_date1_copy() to get a date that can be modified.
         """
-        if self.non_missing_data_date1 is None:
-            return self.non_missing_data_date1
-        else:
-            return DateTime(date_time=self.non_missing_data_date1)
+        return self._get_date(self.non_missing_data_date1)
+
+    def get_non_missing_data_date1_copy(self):
+        """
+        Return a copy of the date corresponding to the first non-missing data, which the caller can modify.
+        @return A copy of the date corresponding to the first non-missing data, or None if not set.
+        """
+        return TSLimits._copy_date(self.non_missing_data_date1)
 
     def get_non_missing_data_date2(self):
         """
         Return the date corresponding to the last non-missing data in the time series.
         @return The date corresponding to the last non-missing data in the time series.
-        A copy of the date is returned.
+        A copy of the date is returned unless the limits are frozen (see calculate_data_limits()),
+        in which case the stored date is returned and must not be modified.
+        Use get_non_missing_data_date2_copy() to get a date that can be modified.
         """
-        if self.non_missing_data_date2 is None:
-            return self.non_missing_data_date2
-        else:
-            return DateTime(date_time=self.non_missing_data_date2)
+        return self._get_date(self.non_missing_data_date2)
+
+    def get_non_missing_data_date2_copy(self):
+        """
+        Return a copy of the date corresponding to the last non-missing data, which the caller can modify.
+        @return A copy of the date corresponding to the last non-missing data, or None if not set.
+        """
+        return TSLimits._copy_date(self.non_missing_data_date2)
 
     def get_sum(self):
         """
@@ -619,6 +964,8 @@ class TSLimits(object):
         Return the skew for the time series.
         @return The skew for the time series, or NaN if not computed.
         """
+        if self.skew is None:
+            self._calculate_std_dev_and_skew()
         return self.skew
 
     def get_std_dev(self):
@@ -626,6 +973,8 @@ class TSLimits(object):
         Return the standard deviation for the time series.
         @return The standard deviation for the time series, or NaN if not computed.
         """
+        if self.std_dev is None:
+            self._calculate_std_dev_and_skew()
         return self.std_dev
 
     # TODO smalers 2020-01-04 copied from TSUtil to prevent circular import reference
@@ -644,16 +993,31 @@ class TSLimits(object):
         @param suggested_start Suggested start date.
         @param suggested_end Suggested end date.
         """
+        start, end = TSLimits._get_valid_dates(ts, suggested_start, suggested_end)
         dates = TSLimits()
+        dates.set_date1(start)
+        dates.set_date2(end)
+        return dates
+
+    @staticmethod
+    def _get_valid_dates(ts, suggested_start, suggested_end):
+        """
+        Determine the valid period as for get_valid_period(), but return the dates as a tuple rather
+        than creating a TSLimits instance.  This is used internally where only the dates are needed.
+        @return Tuple of (start, end), each a new DateTime instance.
+        @param ts Time series of interest.
+        @param suggested_start Suggested start date.
+        @param suggested_end Suggested end date.
+        """
         if (suggested_start is None) and (ts is not None):
-            dates.set_date1(date_time=DateTime(ts.get_date1()))
+            start = DateTime(date_time=ts.get_date1())
         else:
-            dates.set_date1(date_time=DateTime(suggested_start))
+            start = DateTime(date_time=suggested_start)
         if (suggested_end is None) and (ts is not None):
-            dates.set_date2(date_time=DateTime(ts.get_date2()))
+            end = DateTime(date_time=ts.get_date2())
         else:
-            dates.set_date2(date_time=DateTime(suggested_end))
-        return dates
+            end = DateTime(date_time=suggested_end)
+        return start, end
 
     def initialize(self):
         """
@@ -679,9 +1043,13 @@ class TSLimits(object):
         self.non_missing_data_date1 = None
         self.non_missing_data_date2 = None
         self.skew = math.nan
-        self.stdDev = math.nan
+        self.std_dev = math.nan
         self.sum = math.nan  # Assume
         self.found = False
+        self._frozen = False
+        self._dates_set = 0
+        self._stats_values = None
+        self._percents = None
 
     def intervals_match(self, ts1=None, ts2=None, tslist=None, interval_base=None, interval_mult=None):
         """
@@ -690,33 +1058,58 @@ class TSLimits(object):
         @return true if the time series have the same data interval, false if not.
         @param ts1 first time series to check
         @param ts2 second time series to check
+        @param tslist list of time series to check, if ts1 and ts2 are not specified
+        @param interval_base interval base to match for tslist, or None to match the first time series
+        @param interval_mult interval multiplier to match for tslist, or None to match the first time series
         """
         if (ts1 is not None) and (ts2 is not None):
-            tslist = []
-            tslist.append(ts1)
-            tslist.append(ts2)
-            return self.intervals_match(tslist=tslist)
-        elif tslist is not None:
-            if len(tslist) == 0:
+            if ts1 is ts2:
                 return True
-            if interval_base is None and interval_mult is None:
-                # Find first non - null time series to compare...
-                for ts in tslist:
-                    if ts is not None:
-                        return self.intervals_match(tslist=tslist, interval_base=ts.get_data_interval_base(),
-                                                    interval_mult=ts.get_data_interval_mult())
+            return TSLimits._intervals_match_list((ts1, ts2), None, None)
+        elif tslist is not None:
+            return TSLimits._intervals_match_list(tslist, interval_base, interval_mult)
+
+    @staticmethod
+    def _intervals_match_list(tslist, interval_base, interval_mult):
+        """
+        Determine whether the time series in a list have the same data interval, in one pass over the list.
+        @return true if all the time series have the same data interval, false if not.
+        @param tslist list or tuple of time series to check
+        @param interval_base interval base to match, or None to match the first non-null time series
+        @param interval_mult interval multiplier to match, or None to match the first non-null time series
+        """
+        if len(tslist) == 0:
+            return True
+        if (interval_base is None) and (interval_mult is None):
+            # Find first non-null time series to compare...
+            for ts in tslist:
+                if ts is not None:
+                    interval_base = ts.get_data_interval_base()
+                    interval_mult = ts.get_data_interval_mult()
+                    break
+            else:
                 # Could not find non-null time series to check
                 return False
-            else:
-                # Main logic
-                for ts in tslist:
-                    if ts is None:
-                        # Message.printWarning ( 3, "TSUtil.intervalsMatch", "TS [" + i + "] is null" );
-                        return False
-                    if (ts.get_data_interval_base() != interval_base) or (ts.get_data_interval_mult() != interval_mult):
-                        return False
-                # All the intervals match...
-                return True
+        # Main logic, which stops at the first null time series or different interval.
+        interval = (interval_base, interval_mult)
+        return all((ts is not None) and ((ts.data_interval_base, ts.data_interval_mult) == interval)
+                   for ts in tslist)
+
+    def _set_date(self, attribute, date_set_bit, date, copy=True):
+        """
+        Set one of the dates, used by the date setters.  Nothing is done if the date is None.
+        The caller must call check_dates() after setting the dates.
+        @param attribute Name of the data member for the date.
+        @param date_set_bit The _*_SET bit for the date.
+        @param date The date to set.
+        @param copy If True, a copy of the date is stored.  If False, the date is stored without copying,
+        which is used internally for dates that were created for the limits and are not modified elsewhere.
+        """
+        if date is not None:
+            if copy:
+                date = DateTime(date_time=date)
+            setattr(self, attribute, date)
+            self._dates_set |= date_set_bit
 
     def set_date1(self, date1):
         """
@@ -724,8 +1117,7 @@ class TSLimits(object):
         @param date1 The first date for the time series.
         @see TS#allocateDataSpace
         """
-        if date1 is not None:
-            self.date1 = DateTime(date_time=date1)
+        self._set_date("date1", TSLimits._DATE1_SET, date1)
         self.check_dates()
 
     def set_date2(self, date2):
@@ -734,8 +1126,7 @@ class TSLimits(object):
         @param date2 The last date for the time series.
         @see TS#allocateDataSpace
         """
-        if date2 is not None:
-            self.date2 = DateTime(date_time=date2)
+        self._set_date("date2", TSLimits._DATE2_SET, date2)
         self.check_dates()
 
     def set_limits_found(self, flag):
@@ -763,8 +1154,7 @@ class TSLimits(object):
         Set the date corresponding to the maximum data value for the time series.
         @param max_value_date The date corresponding to the maximum data value.
         """
-        if max_value_date is not None:
-            self.max_value_date = DateTime(date_time=max_value_date)
+        self._set_date("max_value_date", TSLimits._MAX_VALUE_DATE_SET, max_value_date)
         self.check_dates()
 
     def set_mean(self, mean):
@@ -796,8 +1186,7 @@ class TSLimits(object):
         Set the date corresponding to the minimum data value for the time series.
         @param min_value_date The date corresponding to the minimum data value.
         """
-        if min_value_date is not None:
-            self.min_value_date = DateTime(date_time=min_value_date)
+        self._set_date("min_value_date", TSLimits._MIN_VALUE_DATE_SET, min_value_date)
         self.check_dates()
 
     def set_missing_data_count(self, missing_data_count):
@@ -819,17 +1208,15 @@ class TSLimits(object):
         Set the date for the first non-missing data value.
         @param date The date for the first non-missing data value.
         """
-        if date is not None:
-            self.non_missing_data_date1 = DateTime(date_time=date)
-            self.check_dates()
+        self._set_date("non_missing_data_date1", TSLimits._NON_MISSING_DATA_DATE1_SET, date)
+        self.check_dates()
 
     def set_non_missing_data_date2(self, date):
         """
         Set the date for the last non-missing data value.
         @param date The date for the last non-missing data value.
         """
-        if date is not None:
-            self.non_missing_data_date2 = DateTime(date_time=date)
+        self._set_date("non_missing_data_date2", TSLimits._NON_MISSING_DATA_DATE2_SET, date)
         self.check_dates()
 
     def set_skew(self, skew):
@@ -870,7 +1257,8 @@ class TSLimits(object):
         record for the time series, use the missing data value from the time series
         for those values.  If the start date or end date are null, the start and end
         dates of the time series are used.  This is a utility routine mainly used by other versions of this routine.
-        @return The array of data for the time series.  If an error, return null.
+        @return The array of data for the time series, as an array.array of float values (or integer values
+        for TSToArrayReturnType.DATE_TIME).  The array is empty if there are no data.
         @param ts Time series to convert data to array format.
         @param start_date Date corresponding to the first date of the returned array.
         @param end_date Date corresponding to the last date of the returned array.
@@ -881,16 +1269,9 @@ class TSLimits(object):
         @param paired_ts
         @param return_type
         """
-        if month_index == None:
-            # Called with no month index
-            month_indices = None
-            if month_index != 0:
-                month_indices = [month_index]
-            # Recursively call
-            return self.to_array(ts, start_date=start_date, end_date=end_date, include_months=include_months,
-                                 include_missing=include_missing)
-
-        # If here do the processing based on input arguments
+        if (month_index is not None) and (month_index != 0):
+            # A single month is requested, which is handled the same as a list of months to include
+            include_months = [month_index]
 
         if paired_ts is not None:
             if not TimeInterval.is_regular_interval(ts.get_data_interval_base()):
@@ -903,9 +1284,7 @@ class TSLimits(object):
                     "Time series from which to extract data has a different interval than paired time series.")
         # Get valid dates because the ones passed in may have been null...
 
-        valid_dates = self.get_valid_period(ts, start_date, end_date)
-        start = valid_dates.get_date1()
-        end = valid_dates.get_date2()
+        start, end = TSLimits._get_valid_dates(ts, start_date, end_date)
 
         interval_base = ts.get_data_interval_base()
         interval_mult = ts.get_data_interval_mult()
@@ -916,41 +1295,52 @@ class TSLimits(object):
         size = self.calculate_data_size(start, end, interval_base, interval_mult)
         if return_type is None:
             return_type = TSToArrayReturnType.DATA_VALUE
-        if return_type == TSToArrayReturnType.DATE_TIME:
+        if return_type is TSToArrayReturnType.DATE_TIME:
             # Only 1Year, 1Month, 1Day intervals are supported
-            if (interval_mult != 1) or ((interval_base != TimeInterval.YEAR) and
-                (interval_base != TimeInterval.YEAR) and (interval_base != TimeInterval.YEAR)):
+            if (interval_mult != 1) or (interval_base not in (TimeInterval.YEAR, TimeInterval.MONTH, TimeInterval.DAY)):
                 # throw new InvalidTimeIntervalException(
                 raise ValueError(
                     "Interval must be Year, Month, or Day (no multiplier) to return date/time as array.")
 
-        include_months_mask = []
+        # Mask indicating whether each month (index 0=Jan) is included...
         if (include_months is None) or (len(include_months) == 0):
-            for i in range(12):
-                include_months_mask[i] = True
+            include_months_mask = [True]*12
+        else:
+            include_months_mask = [False]*12
+            for month in include_months:
+                include_months_mask[month - 1] = True
+
+        # Return a typed array, using integers for date/time values.  The same type is returned in all cases,
+        # including when empty...
+        if return_type is TSToArrayReturnType.DATE_TIME:
+            typecode = 'q'
         else:
-            for i in range(12):
-                include_months_mask[i] = False
-            for i in range(len(include_months)):
-                include_months_mask[include_months[i] - 1] = True
+            typecode = 'd'
 
         if size == 0:
-            return []
-
-        data_array = []  # Initial size including missing
+            return array.array(typecode)
         count = 0  # Number of values in array.
         month = 0  # Month
 
         if interval_base == TimeInterval.IRREGULAR:
+            # Initial size including missing, allocated once at the full size so that values can be assigned
+            # by position...
+            data_array = array.array(typecode, [0])*size
             # Get the data and loop through the vector...
             irrts = ts
             alltsdata = irrts.get_data()
             if alltsdata is None:
                 # No data for the time series...
-                return None
+                logging.getLogger(__name__).warning("No data for " + str(ts) + ", returning empty array.")
+                return array.array(typecode)
             nalltsdata = len(alltsdata)
             tsdata = None
             date = None
+            # Check the return type and select the date/time value function for the loop...
+            return_data_value = return_type is TSToArrayReturnType.DATA_VALUE
+            missing_range = TSLimits._get_missing_range(ts)
+            is_data_missing = ts.is_data_missing
+            get_date_time_value = TSLimits._DATE_TIME_VALUE_FUNCTIONS.get(interval_base)
             for i in range(nalltsdata):
                 tsdata = alltsdata[i]
                 date = tsdata.get_date()
@@ -961,86 +1351,78 @@ class TSLimits(object):
                     month = date.get_month()
                     if include_months_mask[month - 1]:
                         value = tsdata.get_data_value()
-                        if include_missing or not ts.is_data_missing(value):
-                            if return_type == TSToArrayReturnType.DATA_VALUE:
+                        if missing_range is not None:
+                            is_missing = (value != value) or (missing_range[0] <= value <= missing_range[1])
+                        else:
+                            is_missing = is_data_missing(value)
+                        if include_missing or not is_missing:
+                            if return_data_value:
                                 data_array[count] = value
                                 count += 1
-                            elif return_type == TSToArrayReturnType.DATE_TIME:
-                                if interval_base == TimeInterval.YEAR:
-                                    data_array[count] = date.get_year()
-                                    count += 1
-                                elif interval_base == TimeInterval.MONTH:
-                                    data_array[count] = date.get_absolute_month()
-                                    count += 1
-                                elif interval_base == TimeInterval.DAY:
-                                    data_array[count] = date.get_absolute_day()
-                                    count += 1
+                            elif get_date_time_value is not None:
+                                data_array[count] = get_date_time_value(date)
+                                count += 1
+            if count != size:
+                # The original array is too big and needs to be cut down to the exact size due to limited
+                # months or missing data being excluded).  A slice copies the values in one operation...
+                return data_array[:count]
+            # Return the full array...
+            return data_array
         else:
-            # Regular, increment the data by interval...
-            date = DateTime(date_time=start)
-            count = 0
-            do_transfer = False
-            is_missing = False
-            # for ; date.lessThanOrEqualTo( end); date.addInterval(interval_base, interval_mult):
-            first_iteration = True
-            while date.less_than_or_equal_to(end):
-                if first_iteration:
-                    first_iteration = False
-                else:
-                    date.add_interval(interval_base, interval_mult)
-                # First figure out if the data should be skipped because not in a requested month
-                month = date.get_month()
-                if not include_months_mask[month - 1]:
-                    continue
-                # Now transfer the value while checking the paired time series
-                do_transfer = False  # Do not transfer unless criteria are met below
-                value = ts.get_data_value(date)
-                is_missing = ts.is_data_missing(value)
-                if paired_ts is not None:
-                    # Value in "ts" time series MUST be non-missing
-                    if not is_missing:
-                        value2 = paired_ts.get_data_value(date)
-                        is_missing2 = paired_ts.is_data_missing(value2)
-                        if match_other_nonmissing:
-                            # Want non-missing in both "ts" and "pairedTS"
-                            if not is_missing2:
-                                do_transfer = True
-                        else:
-                            # Want non-missing in "ts" and missing in "pairedTS"
-                            if is_missing2:
-                                do_transfer = True
-                else:
-                    if include_missing or not is_missing:
-                        # Value is not missing.
-                        do_transfer = True
-
-                # OK to transfer the value...
-                if do_transfer:
-                    if return_type == TSToArrayReturnType.DATA_VALUE:
-                        data_array[count] = value
-                        count += 1
-                    elif return_type == TSToArrayReturnType.DATE_TIME:
-                        if interval_base == TimeInterval.YEAR:
-                            data_array[count] = date.get_year()
-                            count += 1
-                        elif interval_base == TimeInterval.MONTH:
-                            data_array[count] = date.get_absolute_month()
-                            count += 1
-                        elif interval_base == TimeInterval.DAY:
-                            # TODO smalers 2020-01-04 need to enable
-                            # data_array[count] = date.get_absolute_day()
-                            count += 1
-
-        if count != size:
-            # The original array is too big and needs to be cut down to the exact size due to limited
-            # months or missing data being excluded)...
-            new_data_array = [count]
-            for j in range(count):
-                new_data_array[j] = data_array[j]
-            return new_data_array
-
-        # Return the full array...
-        return data_array
+            # Regular, extract the values for the period in one pass and then select the positions to transfer...
+            values = TSLimits._extract_regular_values(ts, start, end, interval_base, interval_mult)[0]
+            if ((paired_ts is None) and (return_type is TSToArrayReturnType.DATA_VALUE) and
+                    ((include_months is None) or (len(include_months) == 0))):
+                # Common case of all values or all non-missing values, which are selected directly
+                # without the month and position handling below...
+                if include_missing:
+                    return array.array(typecode, values)
+                return array.array(typecode, TSLimits._get_non_missing_values(values, ts.is_data_missing,
+                                                                              TSLimits._get_missing_range(ts)))
+            # The month of each value is only needed if the data should be skipped because not in a requested month
+            months = None
+            if (include_months is not None) and (len(include_months) > 0):
+                months = TSLimits._get_months(start, interval_base, interval_mult, len(values))
+            is_data_missing = ts.is_data_missing
+            if paired_ts is not None:
+                # Select the values while checking the paired time series
+                positions = TSLimits._select_positions(values, months, include_months_mask, is_data_missing, True)
+                values2 = TSLimits._extract_regular_values(paired_ts, start, end, interval_base, interval_mult)[0]
+                positions = TSLimits._filter_paired_positions(positions, values, values2, is_data_missing,
+                                                              paired_ts.is_data_missing, match_other_nonmissing)
+            else:
+                positions = TSLimits._select_positions(values, months, include_months_mask, is_data_missing,
+                                                       include_missing, TSLimits._get_missing_range(ts))
+
+            # OK to transfer the values.  The selected positions are known so the array is created at the
+            # exact size and does not need to be cut down...
+            if return_type is TSToArrayReturnType.DATA_VALUE:
+                return array.array(typecode, [values[i] for i in positions])
+            # The multiplier is 1 so the date/time value at each position is offset from the start by the position
+            get_date_time_value = TSLimits._DATE_TIME_VALUE_FUNCTIONS.get(interval_base)
+            if get_date_time_value is None:
+                # TODO smalers 2020-01-04 need to enable for TimeInterval.DAY
+                return array.array(typecode, [0])*len(positions)
+            start_value = get_date_time_value(start)
+            return array.array(typecode, [start_value + i for i in positions])
+
+    def _get_percents(self):
+        """
+        Return the percentages of missing and non-missing data, used by to_string().
+        The percentages are saved with the counts that they were computed from and are only
+        recomputed if the counts change.
+        @return tuple (missing_percent, non_missing_percent).
+        """
+        counts = (self.missing_data_count, self.non_missing_data_count)
+        if (self._percents is None) or (self._percents[0] != counts):
+            missing_percent = 0.0
+            non_missing_percent = 0.0
+            total_count = self.missing_data_count + self.non_missing_data_count
+            if total_count > 0:
+                missing_percent = 100.0*float(self.missing_data_count)/float(total_count)
+                non_missing_percent = 100.0*float(self.non_missing_data_count)/float(total_count)
+            self._percents = (counts, missing_percent, non_missing_percent)
+        return self._percents[1], self._percents[2]
 
     def to_string(self):
         """
@@ -1050,27 +1432,38 @@ class TSLimits(object):
         units = ""
         if len(self.data_units) > 0:
             units = self.data_units
-        missing_percent = 0.0
-        non_missing_percent = 0.0
-        if (self.missing_data_count + self.non_missing_data_count) > 0:
-            missing_percent = 100.0*float(self.missing_data_count) / \
-                float(self.missing_data_count + self.non_missing_data_count)
-            non_missing_percent = 100.0*float(self.non_missing_data_count) / \
-                float(self.missing_data_count + self.non_missing_data_count)
-        return \
-            "Min:  " + StringUtil.format_string(self.min_value, "%20.4f") + units + " on " + \
-            str(self.min_value_date) + "\n" + \
-            "Max:  " + StringUtil.format_string(self.max_value, "%20.4f") + units + " on " + \
-            str(self.max_value_date) + "\n" + \
-            "Sum:  " + StringUtil.format_string(self.sum, "%20.4f") + units + "\n" + \
-            "Mean: " + StringUtil.format_string(self.mean, "%20.4f") + units + "\n" + \
-            "Median: " + StringUtil.format_string(self.median, "%20.4f") + units + "\n" + \
-            "StdDev: " + StringUtil.format_string(self.stdDev, "%20.4f") + units + "\n" + \
-            "Skew: " + StringUtil.format_string(self.skew, "%20.4f") + units + "\n" + \
-            "Number Missing:     " + str(self.missing_data_count) + " (" + \
-            StringUtil.format_string(missing_percent, "%.2f")+"%)\n" + \
-            "Number Not Missing: " + str(self.non_missing_data_count) + " (" + \
-            StringUtil.format_string(non_missing_percent, "%.2f") + "%)\n" + \
-            "Total period: " + str(self.date1) + " to " + str(self.date2) + "\n" + \
-            "Non-missing data period: " + str(self.non_missing_data_date1) + " to " + \
-            str(self.non_missing_data_date2)
+        missing_percent, non_missing_percent = self._get_percents()
+        # Format the limits with one line for each value...
+        return (
+            f"Min:  {self.min_value:20.4f}{units} on {self.min_value_date}\n"
+            f"Max:  {self.max_value:20.4f}{units} on {self.max_value_date}\n"
+            f"Sum:  {self.sum:20.4f}{units}\n"
+            f"Mean: {self.mean:20.4f}{units}\n"
+            f"Median: {self.get_median():20.4f}{units}\n"
+            f"StdDev: {self.get_std_dev():20.4f}{units}\n"
+            f"Skew: {self.get_skew():20.4f}{units}\n"
+            f"Number Missing:     {self.missing_data_count} ({missing_percent:.2f}%)\n"
+            f"Number Not Missing: {self.non_missing_data_count} ({non_missing_percent:.2f}%)\n"
+            f"Total period: {self.date1} to {self.date2}\n"
+            f"Non-missing data period: {self.non_missing_data_date1} to {self.non_missing_data_date2}")
+
+    def update_dates(self, date1=None, date2=None, max_value_date=None, min_value_date=None,
+                     non_missing_data_date1=None, non_missing_data_date2=None):
+        """
+        Set several dates at once.  This is equivalent to calling the individual date setters, but
+        check_dates() is called only once after all the dates are set.  Dates that are None are not changed.
+        A copy of each date is stored.
+        @param date1 The first date for the time series.
+        @param date2 The last date for the time series.
+        @param max_value_date The date corresponding to the maximum data value.
+        @param min_value_date The date corresponding to the minimum data value.
+        @param non_missing_data_date1 The date for the first non-missing data value.
+        @param non_missing_data_date2 The date for the last non-missing data value.
+        """
+        self._set_date("date1", TSLimits._DATE1_SET, date1)
+        self._set_date("date2", TSLimits._DATE2_SET, date2)
+        self._set_date("max_value_date", TSLimits._MAX_VALUE_DATE_SET, max_value_date)
+        self._set_date("min_value_date", TSLimits._MIN_VALUE_DATE_SET, min_value_date)
+        self._set_date("non_missing_data_date1", TSLimits._NON_MISSING_DATA_DATE1_SET, non_missing_data_date1)
+        self._set_date("non_missing_data_date2", TSLimits._NON_MISSING_DATA_DATE2_SET, non_missing_data_date2)
+        self.check_dates()
@@ -21,6 +21,7 @@
 #
 # NoticeEnd
 
+import functools
 import logging
 
 from RTi.TS.TSIdent import TSIdent
@@ -30,6 +31,30 @@ from RTi.TS.TSLimits import TSLimits
 from RTi.Util.Time.DateTime import DateTime
 from RTi.Util.Time.TimeInterval import TimeInterval
 
+_logger = logging.getLogger(__name__)
+
+
+@functools.lru_cache(maxsize=1024)
+def _parse_interval_fields(tsid, long_id):
+    """
+    Parse the interval parts of a time series identifier, caching the result because many time series
+    are typically created from the same few identifiers.  Only the interval parts are returned so that
+    a shared mutable TimeInterval is not cached.
+    :param tsid: time series identifier as a string.
+    :param long_id: If true, then the string is a full identifier. Otherwise, the string
+    is only the interval (e.g., "10min").
+    :return: tuple of (interval string, interval base, interval multiplier).  The interval base is
+    TimeInterval.UNKNOWN if the interval could not be parsed.
+    """
+    if long_id:
+        # Only the interval is needed to determine the type of time series, so don't create a TSIdent...
+        return TSIdent.parse_interval_only(tsid)
+    # Parse a TimeInterval so that the type of time series can be determined...
+    tsinterval = TimeInterval.parse_interval(tsid)
+    if tsinterval is None:
+        return tsid, TimeInterval.UNKNOWN, 0
+    return tsid, tsinterval.get_base(), tsinterval.get_multiplier()
+
 
 class TSUtil(object):
     """
@@ -43,6 +68,9 @@ class TSUtil(object):
     @see TSLimits
     """
 
+    # Only static methods and constants are defined, so instances have no data.
+    __slots__ = ()
+
     # Used with getPerioodFromTS, and getPeriodFromLimits and others. Find the maximum period.
     MAX_POR = 0
 
@@ -68,6 +96,25 @@ class TSUtil(object):
     TRANSFER_BYDATETIME = "ByDateTime"
     TRANSFER_SEQUENTIALLY = "Sequentially"
 
+    # Time series classes to create for a data interval base, used by new_time_series().
+    _TS_CLASS_BY_BASE = {
+        # TimeInterval.MINUTE: MinuteTS,
+        # TimeInterval.HOUR: HourTS,
+        TimeInterval.DAY: DayTS,
+        TimeInterval.MONTH: MonthTS
+        # TimeInterval.YEAR: YearTS,
+        # TimeInterval.IRREGULAR: IrregularTS
+    }
+
+    # Interval base and multiplier for the most common interval strings, used by new_time_series()
+    # to avoid parsing the interval.
+    _COMMON_INTERVALS = {
+        "Day": (TimeInterval.DAY, 1),
+        "1Day": (TimeInterval.DAY, 1),
+        "Month": (TimeInterval.MONTH, 1),
+        "1Month": (TimeInterval.MONTH, 1)
+    }
+
     @staticmethod
     def get_period_from_ts(tslist, por_flag):
         """
@@ -84,102 +131,95 @@ class TSUtil(object):
         @return The TSLimits for the list of time series (recomputed).  If the limits
         do not overlap, return the maximum.
         @param tslist A list of time series of interest.
-        @param por_flag Use a *_POR flag.
+        @param por_flag Use a *_POR flag.  If AVAILABLE_POR, the period of the first time series that has
+        dates is used.
         @exception RTi.TS.TSException If the period cannot be determined from the time series.
         """
 
-        logger = logging.getLogger(__name__)
-        debug = False
-
-        end = None
-        start = None
+        # Debug messages are only formatted if debug logging is enabled...
+        debug = _logger.isEnabledFor(logging.DEBUG)
 
         if tslist is None:
             message = "Unable to get period for time series - time series list is null"
-            logger.warning(message)
+            _logger.warning(message)
             raise ValueError(message)
 
         list_size = len(tslist)
         if debug:
-            logger.debug("Getting " + str(por_flag) + "-flag limits for " + str(list_size) + " time series")
+            _logger.debug("Getting %s-flag limits for %s time series", por_flag, list_size)
 
         if list_size == 0:
             message = "Unable to get period for time series - time series list is zero size"
-            logger.warning(message)
+            _logger.warning(message)
             raise ValueError(message)
-        if (por_flag != TSUtil.MIN_POR) and (por_flag != TSUtil.MAX_POR):
+        if (por_flag != TSUtil.MIN_POR) and (por_flag != TSUtil.MAX_POR) and (por_flag != TSUtil.AVAILABLE_POR):
             message = "Unknown option for TSUtil.getPeriodForTS" + str(por_flag)
-            logger.warning(message)
+            _logger.warning(message)
             raise ValueError(message)
 
-        # Initialize the start and end dates to the first TS dates...
+        # Get the dates from the time series in one pass, ignoring time series without dates...
 
+        available_por = por_flag == TSUtil.AVAILABLE_POR
+        starts = []
+        ends = []
         nullcount = 0
-        for its in range(list_size):
-            ts_ptr = tslist[its]
-            if ts_ptr is not None:
-                if ts_ptr.get_date1() is not None:
-                    start = ts_ptr.get_date1()
-                if ts_ptr.get_date2() is not None:
-                    end = ts_ptr.get_date2()
-                if (start is not None) and (end is not None):
-                    # Done looking for starting date/times
-                    break
-            else:
-                nullcount += 1
-
-        if debug:
-            logger.debug("Starting comparison dates " + str(start) + " " + str(end))
-
-        if (start is None) or (end is None):
-            message = "Unable to get period (all null dates) from " + str(list_size) +\
-                      " time series (" + str(nullcount) + " null time series)."
-            logger.warning(message)
-            raise ValueError(message)
-
-        # Now loop through the remaining time series...
-
-        for i in range(1, list_size):
-            ts_ptr = tslist[i]
+        for ts_ptr in tslist:
             if ts_ptr is None:
                 # Ignore the time series...
+                nullcount += 1
                 continue
-            ts_ptr_start = ts_ptr.get_date1()
-            ts_ptr_end = ts_ptr.get_date2()
+            # Use the dates without copying because they are only compared, and the limits copy the final dates...
+            ts_ptr_start = ts_ptr.date1
+            ts_ptr_end = ts_ptr.date2
             if (ts_ptr_start is None) or (ts_ptr_end is None):
                 continue
             if debug:
-                logger.debug("Comparison dates " + str(ts_ptr_start) + " " + str(ts_ptr_end))
-            if por_flag == TSUtil.MAX_POR:
-                if ts_ptr_start.less_than(start):
-                    start = DateTime(date_time=ts_ptr_start)
-                if ts_ptr_end.greater_than(end):
-                    end = DateTime(date_time=ts_ptr_end)
-            elif por_flag == TSUtil.MIN_POR:
-                if ts_ptr_start.greater_than(start):
-                    start = DateTime(date_time=ts_ptr_start)
-                if ts_ptr_end.less_than(end):
-                    end = DateTime(date_time=ts_ptr_end)
+                _logger.debug("Comparison dates %s %s", ts_ptr_start, ts_ptr_end)
+            starts.append(ts_ptr_start)
+            ends.append(ts_ptr_end)
+            if available_por:
+                # Use the period of the first time series with dates so no need to check the others...
+                break
+
+        if len(starts) == 0:
+            message = "Unable to get period (all null dates) from " + str(list_size) +\
+                      " time series (" + str(nullcount) + " null time series)."
+            _logger.warning(message)
+            raise ValueError(message)
+
+        # Now find the earliest and latest dates with min() and max() on the comparison keys...
+
+        precision = starts[0].precision
+        start_keys = [date.get_comparison_key(precision) for date in starts]
+        end_keys = [date.get_comparison_key(precision) for date in ends]
+        positions = range(len(starts))
+        max_por = por_flag == TSUtil.MAX_POR
+        if max_por:
+            start = starts[min(positions, key=start_keys.__getitem__)]
+            end = ends[max(positions, key=end_keys.__getitem__)]
+        else:
+            start = starts[max(positions, key=start_keys.__getitem__)]
+            end = ends[min(positions, key=end_keys.__getitem__)]
 
         # If the time series do not overlap, then the limits may be reversed.  In this case, throw an exception...
         if start.greater_than(end):
             message = "Periods do not overlap.  Can't determine minimum period."
-            logger.warning(message)
+            _logger.warning(message)
             raise ValueError(message)
 
         if debug:
-            if por_flag == TSUtil.MAX_POR:
-                if debug:
-                    logger.debug("Maximum POR limits are " + str(start) + " to " + str(end))
-            elif por_flag == TSUtil.MIN_POR:
-                if debug:
-                    logger.debug("Minimum POR limits are " + str(start) + " to " + str(end))
+            if available_por:
+                _logger.debug("Available POR limits are %s to %s", start, end)
+            elif max_por:
+                _logger.debug("Maximum POR limits are %s to %s", start, end)
+            else:
+                _logger.debug("Minimum POR limits are %s to %s", start, end)
 
-        # Now return the dates as a new instance so we don't mess up what was in the time series...
+        # Now return the dates as a new instance so we don't mess up what was in the time series
+        # (the limits copy the dates)...
 
         limits = TSLimits()
-        limits.set_date1(DateTime(date_time=start))
-        limits.set_date2(DateTime(date_time=end))
+        limits.update_dates(date1=start, date2=end)
         limits.set_limits_found(True)
         return limits
 
@@ -201,13 +241,15 @@ class TSUtil(object):
         """
         dates = TSLimits()
         if (suggested_start is None) and (ts is not None):
-            dates.set_date1(DateTime(date_time=ts.get_date1()))
+            date1 = ts.get_date1()
         else:
-            dates.set_date1(DateTime(date_time=suggested_start))
+            date1 = suggested_start
         if (suggested_end is None) and (ts is not None):
-            dates.set_date2(DateTime(date_time=ts.get_date2()))
+            date2 = ts.get_date2()
         else:
-            dates.set_date2(DateTime(date_time=suggested_end))
+            date2 = suggested_end
+        # The dates are copied when set...
+        dates.update_dates(date1=date1, date2=date2)
         return dates
 
     @staticmethod
@@ -220,58 +262,78 @@ class TSUtil(object):
         :param tsid: time series identifier as a string.
         :param long_id: If true, then the string is a full identifier. Otherwise, the string
         is only the interval (e.g., "10min").
-        :return: A pointer to the time series, or null if the time series type cannot be determined.
+        :return: The new time series, or None if the time series type cannot be determined.
         """
-        logger = logging.getLogger(__name__)
-        interval_base = 0
-        interval_mult = 0
-        interval_string = ""
-        if long_id:
-            # Create a TSIdent so that the type of time series can be determined...
-            tsident = TSIdent(tsid)
-
-            # Get the interval and base...
-            interval_string = tsident.get_interval()
-            interval_base = tsident.get_interval_base()
-            interval_mult = tsident.get_interval_mult()
-        else:
-            # Parse a TimeInterval so that the type of time series can be determined...
+        interval = None if long_id else TSUtil._COMMON_INTERVALS.get(tsid)
+        if interval is not None:
+            # Common interval so no need to parse...
             interval_string = tsid
-            tsinterval = TimeInterval.parse_interval(interval_string)
-
-            # Get the interval and base...
-            interval_base = tsinterval.getBase()
-            interval_mult = tsinterval.getMultiplier()
+            interval_base, interval_mult = interval
+        else:
+            interval_string, interval_base, interval_mult = _parse_interval_fields(tsid, long_id)
 
         # Now interpret the results and declare the time series...
-        ts = None
-        # if interval_base == TimeInterval.MINUTE:
-        #     ts = MinuteTS()
-        # elif interval_base == TimeInterval.HOUR:
-        #     ts = HourTS()
-        if interval_base == TimeInterval.DAY:
-            ts = DayTS()
-        elif interval_base == TimeInterval.MONTH:
-            ts = MonthTS()
-        # elif interval_base == TimeInterval.YEAR:
-        #     ts = YearTS()
-        # elif interval_base == TimeInterval.IRREGULAR:
-        #     ts = IrregularTS()
-        else:
-            message = ("Cannot create a new time series for \"" + tsid + "\" (the interval \"" +
-                       interval_string + "\" [" + interval_base + "] is not recognized.")
-            logger.warning(message)
-            return
+        ts_class = TSUtil._TS_CLASS_BY_BASE.get(interval_base)
+        if ts_class is None:
+            if _logger.isEnabledFor(logging.WARNING):
+                _logger.warning(f"Cannot create a new time series for \"{tsid}\" (the interval "
+                                f"\"{interval_string}\" [{interval_base}] is not recognized.")
+            return None
+        ts = ts_class()
 
         # Set the multiplier
-        ts.set_data_interval(interval_base, interval_mult)
-        ts.set_data_interval_original(interval_base, interval_mult)
-        # Set the genesis information
-        ts.add_to_genesis("Created new time series with interval determined from TSID \"" + tsid + "\"")
+        ts.set_data_interval_and_original(interval_base, interval_mult)
+        # Set the genesis information, only building the string if genesis is being recorded
+        if ts.GENESIS_ENABLED:
+            ts.add_to_genesis(f"Created new time series with interval determined from TSID \"{tsid}\"")
 
         # Return whatever was created...
         return ts
 
+    @staticmethod
+    def new_time_series_batch(tsids, long_id):
+        """
+        Create new time series for a list of time series identifiers, as per new_time_series().
+        Each distinct identifier is parsed and checked once, which is faster than calling new_time_series()
+        for each identifier when many time series are created from the same few identifiers.
+        :param tsids: list of time series identifiers as strings.
+        :param long_id: If true, then the strings are full identifiers. Otherwise, the strings
+        are only the interval (e.g., "10min").
+        :return: list of the new time series, in the order of the identifiers, with None for identifiers for
+        which the time series type cannot be determined.
+        """
+        # Group the positions of the identifiers so that each distinct identifier is handled once...
+        positions_by_tsid = {}
+        for i, tsid in enumerate(tsids):
+            positions_by_tsid.setdefault(tsid, []).append(i)
+
+        # Check each distinct identifier, grouping the work by time series class...
+        work_by_class = {}
+        for tsid, positions in positions_by_tsid.items():
+            interval_string, interval_base, interval_mult = _parse_interval_fields(tsid, long_id)
+            ts_class = TSUtil._TS_CLASS_BY_BASE.get(interval_base)
+            if ts_class is None:
+                if _logger.isEnabledFor(logging.WARNING):
+                    _logger.warning(f"Cannot create a new time series for \"{tsid}\" (the interval "
+                                    f"\"{interval_string}\" [{interval_base}] is not recognized.")
+                continue
+            genesis = None
+            if ts_class.GENESIS_ENABLED:
+                genesis = f"Created new time series with interval determined from TSID \"{tsid}\""
+            work_by_class.setdefault(ts_class, []).append((interval_base, interval_mult, genesis, positions))
+
+        # Create all the time series of one class before those of the next so that same-class instances are
+        # allocated together, then put each into the position of its identifier...
+        ts_list = [None]*len(tsids)
+        for ts_class, work in work_by_class.items():
+            for interval_base, interval_mult, genesis, positions in work:
+                for i in positions:
+                    ts = ts_class()
+                    ts.set_data_interval_and_original(interval_base, interval_mult)
+                    ts.add_to_genesis(genesis)
+                    ts_list[i] = ts
+        return ts_list
+
     @staticmethod
     def to_array(ts, start_date=None, end_date=None, month_index=None, month_indices=None, include_missing=None):
         """
@@ -280,18 +342,17 @@ class TSUtil(object):
         record for the time series, use the missing data value from the time series
         for those values.  If the start date or end date are null, the start and end
         dates of the time series are used.  This is a utility routine mainly used by other versions of this routine.
-        @return The array of data for the time series.  If an error, return null.
+        @return The array of data for the time series, as an array.array of float values.
+        The array is empty if there are no data.
         @param ts Time series to convert data to array format.
         @param start_date Date corresponding to the first date of the returned array.
         @param end_date Date corresponding to the last date of the returned array.
         @param month_index Month of interest (1=Jan, 12=Dec).  If zero, process all months.
-        @param includeMissing indicate whether missing values should be included in the result.
+        @param month_indices List of months of interest (1=Jan, 12=Dec), used if month_index is not specified.
+        @param include_missing indicate whether missing values should be included in the result (default is True).
         """
-        if month_index == None:
-            # Called with no month index
-            month_indices = None
-            if month_index != 0:
-                month_indices = [month_index]
-            # Recursively call
-            return TSUtil.to_array(ts, start_date=start_date, end_date=end_date, month_indices=month_indices,
-                                   include_missing=include_missing)
+        if include_missing is None:
+            include_missing = True
+        # The implementation is in TSLimits to prevent a circular import reference
+        return TSLimits().to_array(ts, start_date=start_date, end_date=end_date, month_index=month_index,
+                                   include_months=month_indices, include_missing=include_missing)
@@ -22,7 +22,6 @@
 # NoticeEnd
 
 # from RTi.Util.IO.DataSetComponent import DataSetComponent
-import logging
 
 
 class DataSet(object):
@@ -32,6 +31,10 @@ class DataSet(object):
     a file.  This class should be extended to provide specific functionality for a data set.
     """
 
+    __slots__ = ('basename', 'components', 'component_names', 'component_types', 'component_name_by_type',
+                 'component_groups', 'component_group_assignments', 'component_group_primaries', 'dataset_dir',
+                 'dataset_filename', 'dataset_type', 'component_index')
+
     def __init__(self, component_types=None, component_names=None, component_groups=None,
                  component_group_assignments=None, component_group_primaries=None, dataset_type=None,
                  dataset_dir=None, basename=None):
@@ -51,6 +54,9 @@ class DataSet(object):
         # Array of component types (as integers or Enum of int), corresponding to the component names
         self.component_types = None
 
+        # Dictionary of component types to component names, used by lookup_component_name()
+        self.component_name_by_type = {}
+
         # Array of component types (as integers) that are group components.
         self.component_groups = None
 
@@ -69,6 +75,10 @@ class DataSet(object):
 
         self.dataset_type = -1
 
+        # Dictionary of component type values to components, used to look up components by type.
+        # The dictionary is built when first needed and is reset when components are added to groups.
+        self.component_index = None
+
         # print("component_types: " + str(component_types))
         # print("component_names: " + str(component_names))
         # print("component_groups: " + str(component_groups))
@@ -97,6 +107,7 @@ class DataSet(object):
         further processing. Component groups are not initialized until a data set type is set.
         """
         self.components = []
+        self.invalidate_component_index()
 
     def dataset_init2(self, component_types, component_names, component_groups, component_group_assignments,
                       component_group_primaries):
@@ -120,8 +131,14 @@ class DataSet(object):
         to create the list of objects identifiers in the group.
         """
         self.components = []
+        self.invalidate_component_index()
         self.component_types = component_types
         self.component_names = component_names
+        self.component_name_by_type = {}
+        if (component_types is not None) and (component_names is not None):
+            # Keep the first name for a type, consistent with searching the arrays in order
+            for component_type, component_name in zip(component_types, component_names):
+                self.component_name_by_type.setdefault(component_type, component_name)
         self.component_groups = component_groups
         self.component_group_assignments = component_group_assignments
         self.component_group_primaries = component_group_primaries
@@ -136,6 +153,7 @@ class DataSet(object):
         :param basename: Basename for files (no directory).
         """
         self.components = []
+        self.invalidate_component_index()
         self.dataset_type = dataset_type
         self.dataset_dir = dataset_dir
         self.basename = basename
@@ -146,6 +164,9 @@ class DataSet(object):
         :param comp: Component to add.
         """
         self.components.append(comp)
+        if self.component_index is not None:
+            # The component is last in the search order so can be added to the index...
+            self._index_component(self.component_index, comp)
 
     def get_component_for_component_type(self, comp_type):
         """
@@ -154,51 +175,33 @@ class DataSet(object):
         :return: the component for the requested data component type or null if
         the component is not in the data set.
         """
-        logger = logging.getLogger(__name__)
-        debug = False  # used to troubleshoot
+        if self.component_index is None:
+            # Index the components in the order that they are searched (each component and then
+            # the components in its group) so that the first matching component is found...
+            component_index = {}
+            for component in self.components:
+                self._index_component(component_index, component)
+            self.component_index = component_index
         if isinstance(comp_type, int):
             comp_type_value = comp_type
-            if debug:
-                logging.info("Looking up component matching requested type " + str(comp_type) + " integer value")
         else:
             # Assume Enum
             comp_type_value = comp_type.value
-            if debug:
-                logging.info("Looking up component matching requested type " + str(comp_type) +
-                             "=" + str(comp_type_value) + " enumeration value")
-        for component in self.components:
-            if isinstance(component.get_component_type(), int):
-                get_component_type_value = component.get_component_type()
-                if debug:
-                    logging.info("Checking " + str(get_component_type_value) + " integer value")
-            else:
-                # Assume Enum
-                get_component_type_value = component.get_component_type().value
-                if debug:
-                    logging.info("Checking " + str(component.get_component_type()) + "=" +
-                                 str(get_component_type_value) + " enumeration value")
-            if get_component_type_value == comp_type_value:
-                return component
-            # If the component is a group and did not match the type, check
-            # the sub-types in the component...
-            if component.get_is_group():
-                # Data is the list of components in the group
-                v = component.get_data()
-                if v is not None:
-                    for component2 in v:
-                        if isinstance(component2.get_component_type(), int):
-                            get_component_type_value2 = component2.get_component_type()
-                            if debug:
-                                logging.info("Checking group " + str(get_component_type_value2) + " integer value")
-                        else:
-                            # Assume Enum
-                            get_component_type_value2 = component2.get_component_type().value
-                            if debug:
-                                logging.info("Checking group " + str(component2.get_component_type()) + "=" +
-                                             str(get_component_type_value2) + " enumeration value")
-                        if get_component_type_value2 == comp_type_value:
-                            return component2
-        return None
+        return self.component_index.get(comp_type_value)
+
+    def get_components_for_component_types(self, comp_types):
+        """
+        Return the components for a list of data component types, for example to operate on many components at once.
+        :param comp_types: List of component types as StateMod_DataSetComponentType or int
+        :return: list of the components for the requested data component types, in the order of the types.
+        Types that do not have a component in the data set are skipped.
+        """
+        components = []
+        for comp_type in comp_types:
+            component = self.get_component_for_component_type(comp_type)
+            if component is not None:
+                components.append(component)
+        return components
 
     def get_dataset_directory(self):
         """
@@ -206,6 +209,31 @@ class DataSet(object):
         """
         return self.dataset_dir
 
+    @staticmethod
+    def _index_component(component_index, component):
+        """
+        Add a component and, if a group, the components in the group to a component index,
+        used by get_component_for_component_type().  Component types that are already in the index are not replaced.
+        :param component_index: Dictionary of component type values to components.
+        :param component: Component to add to the index.
+        """
+        components = [component]
+        if component.get_is_group() and (component.get_data() is not None):
+            # Data is the list of components in the group
+            components.extend(component.get_data())
+        for component2 in components:
+            if isinstance(component2.get_component_type(), int):
+                component_index.setdefault(component2.get_component_type(), component2)
+            else:
+                # Assume Enum
+                component_index.setdefault(component2.get_component_type().value, component2)
+
+    def invalidate_component_index(self):
+        """
+        Indicate that the component index must be rebuilt, for example because components were added to a group.
+        """
+        self.component_index = None
+
     def lookup_component_name(self, component_type):
         """
         Return the component name given its number
@@ -213,11 +241,9 @@ class DataSet(object):
         :return: the component name given its number or null if the component type is not
         found.
         """
-        # The component types are not necessarily numbers that match array indices so that
-        # match the type values
-        for i, component_type_search in enumerate(self.component_types):
-            if component_type == component_type_search:
-                return self.component_names[i]
+        # The component types are not necessarily numbers that match array indices so look up
+        # the type values
+        return self.component_name_by_type.get(component_type)
 
     def set_dataset_directory(self, dataset_dir):
         """
@@ -244,8 +270,18 @@ class DataSet(object):
         self.dataset_type = dataset_type
         if initialize_components:
             self.components.clear()
+            self.invalidate_component_index()
 
     def set_dirty(self, component_type, is_dirty):
         comp = self.get_component_for_component_type(component_type)
         if comp is not None:
             comp.set_dirty(is_dirty)
+
+    def set_dirty_for_component_types(self, comp_types, is_dirty):
+        """
+        Set whether the components for a list of data component types are dirty, for example after a bulk import.
+        :param comp_types: List of component types as StateMod_DataSetComponentType or int
+        :param is_dirty: True if the components are dirty (have been edited).
+        """
+        for comp in self.get_components_for_component_types(comp_types):
+            comp.set_dirty(is_dirty)
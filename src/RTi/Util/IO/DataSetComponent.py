@@ -32,6 +32,10 @@ class DataSetComponent(object):
     Components may be initialized during automated data processing or may be read and then edited in a UI.
     """
 
+    __slots__ = ('comp_type', 'name', 'data_file_name', 'commandFileName', 'list_file_name', 'list_source', 'data',
+                 'is_dirty', 'error_reading_input_file', 'is_group', 'is_output', 'is_visible', 'parent', 'dataset',
+                 'data_check_results')
+
     # Indicate how the list for a component group is created.
     LIST_SOURCE_PRIMARY_COMPONENT = "PrimaryComponent"
     LIST_SOURCE_NETWORK_COMPONENT = "Network"
@@ -145,6 +149,8 @@ class DataSetComponent(object):
             self.data = []
         self.data.append(component)
         component.parent = self
+        if self.dataset is not None:
+            self.dataset.invalidate_component_index()
         # if Message.isDebugOn:
         #   Message.printDebug( 1, routine, "Added " + component.getComponentName() + " to " getComponentName())
 
@@ -187,6 +193,9 @@ class DataSetComponent(object):
         :param data: Data object containing the component's data.
         """
         self.data = data
+        if self.is_group and (self.dataset is not None):
+            # The data are the components in the group
+            self.dataset.invalidate_component_index()
 
     def set_data_file_name(self, filename):
         """
@@ -23,7 +23,43 @@ class MathUtil(object):
 
     @staticmethod
     def median(n, data):
-        return None
+        """
+        Compute the median of the first n values in a list.
+        The middle value(s) are found by selection, which is O(n) on average, rather than by sorting.
+        :param n: number of values in data to use.
+        :param data: list of values, which is not modified.
+        :return: the median, or None if n is zero.
+        """
+        if n <= 0:
+            return None
+        # The selection does not modify its input, so only slice when fewer than all values are used.
+        values = data if n == len(data) else data[:n]
+        k = n // 2
+        if n % 2 == 1:
+            return MathUtil._select(values, k)
+        return 0.5*(MathUtil._select(values, k - 1) + MathUtil._select(values, k))
+
+    @staticmethod
+    def _select(values, k):
+        """
+        Return the k-th smallest value using quickselect.  Each step partitions the remaining values
+        around a pivot with list comprehensions and keeps only the part that contains the k-th value.
+        :param values: list of values, which is not modified.
+        :param k: zero-based rank of the value to return (0 for the smallest).
+        :return: the k-th smallest value.
+        """
+        while True:
+            pivot = values[len(values) // 2]
+            lows = [value for value in values if value < pivot]
+            if k < len(lows):
+                values = lows
+                continue
+            k -= len(lows)
+            n_pivot = values.count(pivot)
+            if k < n_pivot:
+                return pivot
+            k -= n_pivot
+            values = [value for value in values if value > pivot]
 
     @staticmethod
     def skew(n, data):
@@ -1099,18 +1099,12 @@ class StringUtil:
         :param delim: Delimiter character to read to.
         :return: String up to but not including the delimiter character.
         """
-        i = 0
         string = ""
 
         if string0 is None:
             return string
-        while True:
-            c = string[i]
-            if c == delim:
-                return string
-            else:
-                string += c
-            i += 1
-            if c == '\0':
+        for c in string0:
+            if (c == delim) or (c == '\0'):
                 break
+            string += c
         return string
@@ -118,6 +118,17 @@ class DateTime(object):
     # Create a DateTime with a precision that includes the time zone (and may include another precision flag).
     PRECISION_TIME_ZONE = 0x20000
 
+    # Number of date/time fields (year, month, day, hour, minute, second, hundredth-second) in the comparison key
+    # for a precision, used by get_comparison_key().
+    _COMPARISON_KEY_LENGTHS = {
+        PRECISION_YEAR: 1,
+        PRECISION_MONTH: 2,
+        PRECISION_DAY: 3,
+        PRECISION_HOUR: 4,
+        PRECISION_MINUTE: 5,
+        PRECISION_SECOND: 6
+    }
+
     # Alphabetize the formats, but the numbers may not be in order because they
     # are added over time (do not renumber because some dependent classes may not get recompiled).
 
@@ -452,6 +463,19 @@ class DateTime(object):
         # since some data are public, recompute...
         return self.year * 12 + self.month
 
+    def get_comparison_key(self, precision=None):
+        """
+        Return a key for comparing the DateTime with others, for example with min() or max() over many dates.
+        Keys compare in date/time order.  Time zone is not considered in the comparison.
+        :param precision: Precision for the comparison (see PRECISION_*), or None to use the instance precision.
+        Use the same precision for all the dates that are compared.
+        :return: tuple of the date/time fields, to the precision.
+        """
+        if precision is None:
+            precision = self.precision
+        key_length = DateTime._COMPARISON_KEY_LENGTHS.get(precision, 7)
+        return (self.year, self.month, self.day, self.hour, self.minute, self.second, self.hsecond)[:key_length]
+
     def get_day(self):
         """
         Return the day
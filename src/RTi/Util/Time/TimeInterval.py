@@ -139,7 +139,7 @@ Determine whether an interval is regular.
             interval.set_multiplier(int(interval_string))
             return interval
         else:
-            interval_mult_string = interval_string[digit_count:]
+            interval_mult_string = interval_string[0:digit_count]
             interval.set_multiplier(int(interval_mult_string))
             interval.set_multiplier_string(interval_mult_string)
 
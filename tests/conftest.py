@@ -0,0 +1,5 @@
+# The library is not installed as a package, so make the source folder importable for the tests.
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
@@ -0,0 +1,19 @@
+import logging
+
+from RTi.TS.TSIdent import TSIdent
+from RTi.Util.Time.TimeInterval import TimeInterval
+
+
+def test_set_interval_parses_interval():
+    tsident = TSIdent()
+    tsident.set_interval(interval_string="Month")
+    assert tsident.get_interval_base() == TimeInterval.MONTH
+    assert tsident.get_interval_mult() == 1
+
+
+def test_unrecognized_interval_warns_each_time(caplog):
+    with caplog.at_level(logging.WARNING, logger="RTi.Util.Time.TimeInterval"):
+        for i in range(2):
+            caplog.clear()
+            TSIdent().set_interval(interval_string="Fortnight")
+            assert "Unrecognized interval" in caplog.text
@@ -0,0 +1,60 @@
+from RTi.TS.TSLimits import TSLimits
+from RTi.TS.TSUtil import TSUtil
+from RTi.Util.Time.DateTime import DateTime
+
+
+def month_date(year, month):
+    date = DateTime(flag=DateTime.PRECISION_MONTH)
+    date.set_year(year)
+    date.set_month(month)
+    return date
+
+
+def month_ts(values):
+    """
+    Create a monthly time series starting in 2000-01 with the given values.
+    """
+    ts = TSUtil.new_time_series("Loc.Source.Type.Month", True)
+    ts.set_date1(month_date(2000, 1))
+    ts.set_date2(month_date(2000, len(values)))
+    ts.allocate_data_space()
+    for i, value in enumerate(values):
+        ts.set_data_value(month_date(2000, i + 1), value)
+    return ts
+
+
+def data_limits(ts):
+    limits = TSLimits()
+    limits.calculate_data_limits(ts, ts.get_date1(), ts.get_date2(), False)
+    return limits
+
+
+def assert_month(date, year, month):
+    assert (date.get_year(), date.get_month()) == (year, month)
+
+
+def test_max_min_value_dates():
+    limits = data_limits(month_ts([3.0, 9.0, 5.0, 1.0, 4.0]))
+    assert limits.get_max_value() == 9.0
+    assert_month(limits.get_max_value_date(), 2000, 2)
+    assert limits.get_min_value() == 1.0
+    assert_month(limits.get_min_value_date(), 2000, 4)
+
+
+def test_max_min_value_dates_missing_first():
+    ts = month_ts([-999.0, 3.0, 9.0, 1.0, 4.0, 2.0])
+    limits = data_limits(ts)
+    assert limits.get_max_value() == 9.0
+    assert_month(limits.get_max_value_date(), 2000, 3)
+    assert limits.get_min_value() == 1.0
+    assert_month(limits.get_min_value_date(), 2000, 4)
+    assert_month(limits.get_non_missing_data_date1(), 2000, 2)
+    assert limits.get_missing_data_count() == 1
+
+
+def test_date_copy_can_be_modified():
+    limits = data_limits(month_ts([3.0, 9.0, 5.0, 1.0, 4.0]))
+    date = limits.get_max_value_date_copy()
+    assert date is not limits.get_max_value_date()
+    date.set_month(5)
+    assert_month(limits.get_max_value_date(), 2000, 2)